@@ -0,0 +1,33 @@
+"""
+Frontend build — minify, fingerprint and pre-compress frontend/ into frontend/dist/.
+
+main.py serves dist/ automatically once it exists and is newer than the sources;
+serve.py runs this build before starting its workers.
+
+    python build_assets.py
+"""
+import os, argparse
+from pathlib import Path
+from services import static_assets
+
+FRONTEND_DIR = Path(__file__).parent.parent / "frontend"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--src", default=str(FRONTEND_DIR))
+    parser.add_argument("--out", help="output directory (default: <src>/dist)")
+    args = parser.parse_args()
+
+    manifest = static_assets.build(Path(args.src), Path(args.out) if args.out else None)
+    for name, sizes in manifest["sizes"].items():
+        variants = "  ".join(f"{enc} {size:>7,}" for enc, size in sizes.items())
+        print(f"{name:<28} {variants}")
+    if static_assets.brotli is None:
+        print("[WARN] brotli not installed; built gzip variants only")
+    print(f"[OK] {len(manifest['assets'])} assets fingerprinted into "
+          f"{os.path.join(args.out or args.src, '' if args.out else static_assets.DIST_NAME)}")
+
+
+if __name__ == "__main__":
+    main()
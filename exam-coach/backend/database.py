@@ -2,8 +2,8 @@
 SQLAlchemy database engine, session factory, and table definitions.
 """
 from sqlalchemy import (
-    create_engine, Column, Integer, String, Float, Boolean,
-    DateTime, Text, ForeignKey
+    create_engine, event, Column, Integer, String, Float, Boolean,
+    DateTime, Text, ForeignKey, Index, UniqueConstraint
 )
 from sqlalchemy.orm import declarative_base, sessionmaker, relationship
 from datetime import datetime
@@ -11,9 +11,21 @@ import os
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DB_PATH = os.path.join(BASE_DIR, "exam_coach.db")
-DATABASE_URL = f"sqlite:///{DB_PATH}"
+DATABASE_URL = os.getenv("DATABASE_URL", f"sqlite:///{DB_PATH}")
 
 engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+
+
+@event.listens_for(engine, "connect")
+def _sqlite_pragmas(dbapi_conn, _record):
+    # WAL lets readers in one worker proceed while another worker writes;
+    # busy_timeout makes concurrent writers wait instead of failing immediately.
+    cur = dbapi_conn.cursor()
+    cur.execute("PRAGMA journal_mode=WAL")
+    cur.execute("PRAGMA busy_timeout=5000")
+    cur.close()
+
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
@@ -31,6 +43,7 @@ class Student(Base):
     topic_scores = relationship("TopicScore", back_populates="student")
     study_plans = relationship("StudyPlan", back_populates="student")
     recommendations = relationship("Recommendation", back_populates="student")
+    revision_items = relationship("RevisionItem", back_populates="student")
 
 
 class MockTest(Base):
@@ -74,8 +87,38 @@ class TopicScore(Base):
     student = relationship("Student", back_populates="topic_scores")
 
 
+class TestSummary(Base):
+    """Per-test totals kept after the retention job archives a test's question_results."""
+    __tablename__ = "test_summaries"
+    id = Column(Integer, primary_key=True, index=True)
+    mock_test_id = Column(Integer, ForeignKey("mock_tests.id"), unique=True, nullable=False)
+    student_id = Column(Integer, ForeignKey("students.id"), nullable=False, index=True)
+    total_questions = Column(Integer, default=0)
+    correct = Column(Integer, default=0)
+    time_sum = Column(Float, default=0.0)       # seconds
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class TopicRollup(Base):
+    """Per-(student, topic) aggregate of archived question_results; feeds the scorer."""
+    __tablename__ = "topic_rollups"
+    __table_args__ = (
+        UniqueConstraint("student_id", "subject", "topic", name="uq_topic_rollups_student_topic"),
+    )
+    id = Column(Integer, primary_key=True, index=True)
+    student_id = Column(Integer, ForeignKey("students.id"), nullable=False)
+    subject = Column(String(100))
+    topic = Column(String(200))
+    total = Column(Integer, default=0)
+    correct = Column(Integer, default=0)
+    time_sum = Column(Float, default=0.0)       # seconds
+    time_max = Column(Float, default=0.0)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+
 class StudyPlan(Base):
     __tablename__ = "study_plans"
+    __table_args__ = (Index("ix_study_plans_student_created", "student_id", "created_at"),)
     id = Column(Integer, primary_key=True, index=True)
     student_id = Column(Integer, ForeignKey("students.id"), nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
@@ -86,6 +129,7 @@ class StudyPlan(Base):
 
 class Recommendation(Base):
     __tablename__ = "recommendations"
+    __table_args__ = (Index("ix_recommendations_student_created", "student_id", "created_at"),)
     id = Column(Integer, primary_key=True, index=True)
     student_id = Column(Integer, ForeignKey("students.id"), nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
@@ -94,10 +138,35 @@ class Recommendation(Base):
     student = relationship("Student", back_populates="recommendations")
 
 
+class RevisionItem(Base):
+    """SM-2 memory state for one (student, topic); `due_at` drives the revision queue."""
+    __tablename__ = "revision_items"
+    __table_args__ = (
+        UniqueConstraint("student_id", "subject", "topic", name="uq_revision_items_student_topic"),
+        Index("ix_revision_items_student_due", "student_id", "due_at"),
+    )
+    id = Column(Integer, primary_key=True, index=True)
+    student_id = Column(Integer, ForeignKey("students.id"), nullable=False)
+    subject = Column(String(100))
+    topic = Column(String(200))
+    easiness = Column(Float, default=2.5)
+    interval_days = Column(Integer, default=0)
+    repetitions = Column(Integer, default=0)
+    last_quality = Column(Integer, default=0)       # 0-5, SM-2 grade of the last attempt
+    last_practiced_at = Column(DateTime, default=datetime.utcnow)
+    due_at = Column(DateTime, default=datetime.utcnow, index=True)
+
+    student = relationship("Student", back_populates="revision_items")
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 def init_db():
-    """Create all tables and seed a default student if needed."""
+    """Create all tables (and any indexes added since) and seed a default student if needed."""
     Base.metadata.create_all(bind=engine)
+    # create_all skips indexes on tables that already exist
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
     db = SessionLocal()
     try:
         if not db.query(Student).filter_by(id=1).first():
@@ -3,12 +3,15 @@ FastAPI Application Entry Point
 """
 import os
 from pathlib import Path
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
-from database import init_db
-from routers import tests, analysis, study_plan, recommendations, progress, auth
+from database import init_db, engine
+from routers import tests, analysis, study_plan, recommendations, progress, auth, revision, metrics, retention
+from services.metrics import metrics_middleware, instrument_engine
+from services import retention as retention_service, rescore_queue, metrics as metrics_service
+from services.static_assets import PrecompressedStaticFiles, resolve_dir
 
 app = FastAPI(
     title="Personalized Entrance Exam Coach API",
@@ -23,6 +26,8 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.middleware("http")(metrics_middleware)
+instrument_engine(engine)
 
 # Include all routers
 app.include_router(tests.router)
@@ -31,34 +36,57 @@ app.include_router(study_plan.router)
 app.include_router(recommendations.router)
 app.include_router(progress.router)
 app.include_router(auth.router)
+app.include_router(revision.router)
+app.include_router(metrics.router)
+app.include_router(retention.router)
 
 # Serve frontend static files
 FRONTEND_DIR = Path(__file__).parent.parent / "frontend"
 SAMPLE_DATA_DIR = Path(__file__).parent.parent / "sample_data"
+# frontend/dist (see build_assets.py) once built: hashed, precompressed, immutable
+ASSETS_DIR = resolve_dir(FRONTEND_DIR)
 
 if FRONTEND_DIR.exists():
-    app.mount("/static", StaticFiles(directory=str(FRONTEND_DIR)), name="static")
+    static_files = PrecompressedStaticFiles(directory=str(ASSETS_DIR))
+    app.mount("/static", static_files, name="static")
 
 if SAMPLE_DATA_DIR.exists():
     app.mount("/sample_data", StaticFiles(directory=str(SAMPLE_DATA_DIR)), name="sample_data")
 
     @app.get("/", response_class=FileResponse)
-    def serve_frontend():
-        return str(FRONTEND_DIR / "index.html")
+    async def serve_frontend(request: Request):
+        return await static_files.get_response("index.html", request.scope)
 
     @app.get("/login", response_class=FileResponse)
-    def serve_login():
-        return str(FRONTEND_DIR / "login.html")
+    async def serve_login(request: Request):
+        return await static_files.get_response("login.html", request.scope)
+
+
+# Set by serve.py, which has already created the tables, requeued stale scores
+# and cleared the previous run's metrics
+SERVE_WORKER = os.getenv("SERVE_WORKER") == "1"
 
 
 @app.on_event("startup")
 def startup_event():
-    init_db()
-    print("[OK] Database initialised")
+    if not SERVE_WORKER:
+        init_db()
+        print("[OK] Database initialised")
+        metrics_service.reset_shared()
+    rescore_queue.start_background(requeue=not SERVE_WORKER)
+    retention_service.start_background()
+    metrics_service.start_background()
     print("[OK] Exam Coach API running at http://localhost:8000")
     print("[OK] API docs at http://localhost:8000/docs")
 
 
+@app.on_event("shutdown")
+def shutdown_event():
+    retention_service.stop_background()
+    rescore_queue.stop_background()
+    metrics_service.stop_background()
+
+
 @app.get("/health")
 def health():
     return {"status": "ok", "message": "Exam Coach API is healthy"}
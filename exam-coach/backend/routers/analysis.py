@@ -3,15 +3,27 @@ Router: Weakness Analysis
 GET /api/analysis/{student_id}
 """
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import func, Integer
 from sqlalchemy.orm import Session
-from database import get_db, TopicScore, QuestionResult, MockTest
+from database import get_db, TopicScore, QuestionResult, MockTest, TestSummary
 from schemas import AnalysisOut, TopicScoreOut
+from services import metrics, shared_store, rescore_queue
+from services.metrics import ProfiledRoute
 
-router = APIRouter(prefix="/api/analysis", tags=["Analysis"])
+ANALYSIS_CACHE_TTL = 600  # seconds; entries are also invalidated by the student's data version
+
+router = APIRouter(prefix="/api/analysis", tags=["Analysis"], route_class=ProfiledRoute)
 
 
 @router.get("/{student_id}", response_model=AnalysisOut)
 def get_analysis(student_id: int, db: Session = Depends(get_db)):
+    rescore_queue.flush(student_id)
+    cache_key = f"analysis:{student_id}:{shared_store.student_version(student_id)}"
+    cached = shared_store.get(cache_key)
+    metrics.record_cache("analysis", cached is not None)
+    if cached is not None:
+        return AnalysisOut(**cached)
+
     scores = (
         db.query(TopicScore)
         .filter_by(student_id=student_id)
@@ -19,15 +31,20 @@ def get_analysis(student_id: int, db: Session = Depends(get_db)):
         .all()
     )
 
-    # Total question stats
-    all_qr = (
-        db.query(QuestionResult)
+    # Total question stats (live results + summaries of archived tests)
+    live_total, live_correct = (
+        db.query(func.count(QuestionResult.id), func.sum(QuestionResult.is_correct, type_=Integer))
         .join(QuestionResult.mock_test)
         .filter(MockTest.student_id == student_id)
-        .all()
+        .one()
+    )
+    archived_total, archived_correct = (
+        db.query(func.sum(TestSummary.total_questions), func.sum(TestSummary.correct))
+        .filter(TestSummary.student_id == student_id)
+        .one()
     )
-    total = len(all_qr)
-    correct = sum(1 for q in all_qr if q.is_correct)
+    total = (live_total or 0) + (archived_total or 0)
+    correct = (live_correct or 0) + (archived_correct or 0)
 
     ranked = []
     for i, s in enumerate(scores):
@@ -43,7 +60,7 @@ def get_analysis(student_id: int, db: Session = Depends(get_db)):
     weak = ranked[:mid]
     strong = ranked[mid:]
 
-    return AnalysisOut(
+    out = AnalysisOut(
         student_id=student_id,
         total_questions=total,
         total_correct=correct,
@@ -51,3 +68,5 @@ def get_analysis(student_id: int, db: Session = Depends(get_db)):
         weak_topics=weak,
         strong_topics=strong,
     )
+    shared_store.put(cache_key, out.model_dump(mode="json"), ttl=ANALYSIS_CACHE_TTL)
+    return out
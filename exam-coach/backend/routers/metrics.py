@@ -0,0 +1,15 @@
+"""
+Router: Metrics
+GET /metrics  (Prometheus text format)
+"""
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from services import metrics
+from services.metrics import ProfiledRoute
+
+router = APIRouter(tags=["Metrics"], route_class=ProfiledRoute)
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
@@ -3,15 +3,19 @@ Router: Student Progress
 GET /api/progress/{student_id}
 """
 from fastapi import APIRouter, Depends
+from sqlalchemy import func, Integer
 from sqlalchemy.orm import Session
-from database import get_db, MockTest, QuestionResult, TopicScore
+from database import get_db, MockTest, QuestionResult, TopicScore, TestSummary
 from schemas import ProgressOut, ProgressPoint, TopicScoreOut
+from services import rescore_queue
+from services.metrics import ProfiledRoute
 
-router = APIRouter(prefix="/api/progress", tags=["Progress"])
+router = APIRouter(prefix="/api/progress", tags=["Progress"], route_class=ProfiledRoute)
 
 
 @router.get("/{student_id}", response_model=ProgressOut)
 def get_progress(student_id: int, db: Session = Depends(get_db)):
+    rescore_queue.flush(student_id)
     tests = (
         db.query(MockTest)
         .filter_by(student_id=student_id)
@@ -19,13 +23,28 @@ def get_progress(student_id: int, db: Session = Depends(get_db)):
         .all()
     )
 
+    # Per-test totals: live question_results, plus summaries of archived tests
+    totals = {
+        tid: (total, correct or 0, time_sum or 0.0)
+        for tid, total, correct, time_sum in
+        db.query(
+            QuestionResult.mock_test_id,
+            func.count(QuestionResult.id),
+            func.sum(QuestionResult.is_correct, type_=Integer),
+            func.sum(QuestionResult.time_taken),
+        )
+        .join(QuestionResult.mock_test)
+        .filter(MockTest.student_id == student_id)
+        .group_by(QuestionResult.mock_test_id)
+        .all()
+    }
+    for s in db.query(TestSummary).filter_by(student_id=student_id).all():
+        totals[s.mock_test_id] = (s.total_questions, s.correct, s.time_sum)
+
     history = []
     for i, test in enumerate(tests):
-        qrs = test.question_results
-        total = len(qrs)
-        correct = sum(1 for q in qrs if q.is_correct)
-        times = [q.time_taken for q in qrs]
-        avg_time = round(sum(times) / len(times), 1) if times else 0
+        total, correct, time_sum = totals.get(test.id, (0, 0, 0.0))
+        avg_time = round(time_sum / total, 1) if total else 0
         accuracy = round(correct / total * 100, 1) if total else 0
         history.append(ProgressPoint(
             test_number=i + 1,
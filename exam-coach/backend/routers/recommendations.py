@@ -4,18 +4,23 @@ POST /api/recommendations/{student_id}
 GET  /api/recommendations/{student_id}/latest
 """
 import json
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from database import get_db, TopicScore, Recommendation
 from schemas import RecommendationOut
-from services.llm_client import generate_recommendations
+from services import shared_store, rescore_queue
+from services.llm_client import LLM_RATE_LIMIT_PER_MIN, generate_recommendations
 from datetime import datetime
+from services.metrics import ProfiledRoute
 
-router = APIRouter(prefix="/api/recommendations", tags=["Recommendations"])
+router = APIRouter(prefix="/api/recommendations", tags=["Recommendations"], route_class=ProfiledRoute)
 
 
 @router.post("/{student_id}", response_model=RecommendationOut)
 def create_recommendations(student_id: int, db: Session = Depends(get_db)):
+    if LLM_RATE_LIMIT_PER_MIN and not shared_store.allow(f"llm:{student_id}", LLM_RATE_LIMIT_PER_MIN, 60):
+        raise HTTPException(status_code=429, detail="Too many generation requests, try again in a minute.")
+    rescore_queue.flush(student_id)
     scores = (
         db.query(TopicScore)
         .filter_by(student_id=student_id)
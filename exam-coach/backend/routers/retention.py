@@ -0,0 +1,44 @@
+"""
+Router: Retention (admin)
+GET  /api/admin/retention       last pass report + policy
+POST /api/admin/retention/run   run a pass now (needs RETENTION_ADMIN_TOKEN, sent as X-Admin-Token)
+"""
+import os, secrets
+from fastapi import APIRouter, Header, HTTPException
+from services import retention
+from services.metrics import ProfiledRoute
+
+# Manual runs delete history and VACUUM under an exclusive lock, so they are off
+# unless an operator sets a token.
+ADMIN_TOKEN = os.getenv("RETENTION_ADMIN_TOKEN", "")
+
+router = APIRouter(prefix="/api/admin/retention", tags=["Admin"], route_class=ProfiledRoute)
+
+
+def _policy() -> dict:
+    return {
+        "keep_plans": retention.KEEP_PLANS,
+        "keep_recommendations": retention.KEEP_RECOMMENDATIONS,
+        "raw_days": retention.RAW_DAYS,
+        "batch_tests": retention.BATCH_TESTS,
+        "interval_min": retention.INTERVAL_MIN,
+        "vacuum_min_free_mb": retention.VACUUM_MIN_FREE_MB,
+        "background_enabled": retention.ENABLED,
+    }
+
+
+@router.get("")
+def get_retention_status():
+    return {"policy": _policy(), "last_report": retention.last_report()}
+
+
+@router.post("/run")
+def run_retention_now(vacuum: bool = True, x_admin_token: str = Header(None)):
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Manual retention runs are disabled (set RETENTION_ADMIN_TOKEN).")
+    if not x_admin_token or not secrets.compare_digest(x_admin_token, ADMIN_TOKEN):
+        raise HTTPException(status_code=401, detail="Invalid admin token.")
+    report = retention.run_retention(vacuum=vacuum)
+    if report is None:
+        raise HTTPException(status_code=409, detail="A retention pass is already running.")
+    return report
@@ -0,0 +1,39 @@
+"""
+Router: Spaced Revision
+GET /api/revision/{student_id}/due
+GET /api/revision/overdue
+"""
+from datetime import datetime
+from typing import Optional
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+from database import get_db
+from schemas import RevisionDueOut, RevisionItemOut, OverdueOut, OverdueStudent
+from services.revision_scheduler import due_items, students_with_overdue
+from services.metrics import ProfiledRoute
+
+router = APIRouter(prefix="/api/revision", tags=["Revision"], route_class=ProfiledRoute)
+
+
+@router.get("/overdue", response_model=OverdueOut)
+def get_overdue_students(until: Optional[datetime] = None, db: Session = Depends(get_db)):
+    as_of = until or datetime.utcnow()
+    rows = students_with_overdue(db, as_of)
+    return OverdueOut(
+        as_of=as_of,
+        students=[
+            OverdueStudent(student_id=sid, overdue_count=count, oldest_due_at=oldest)
+            for sid, count, oldest in rows
+        ],
+    )
+
+
+@router.get("/{student_id}/due", response_model=RevisionDueOut)
+def get_due_revision(student_id: int, until: Optional[datetime] = None, db: Session = Depends(get_db)):
+    as_of = until or datetime.utcnow()
+    items = due_items(db, student_id, as_of)
+    return RevisionDueOut(
+        student_id=student_id,
+        as_of=as_of,
+        due=[RevisionItemOut.model_validate(it) for it in items],
+    )
@@ -1,17 +1,20 @@
 """
-Router: 7-Day Study Plan
-POST /api/study-plan/{student_id}
+Router: Study Plan
+POST /api/study-plan/{student_id}?days=7&daily_hours=3
 GET  /api/study-plan/{student_id}/latest
 """
 import json
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from database import get_db, TopicScore, StudyPlan
 from schemas import StudyPlanOut
-from services.llm_client import generate_study_plan
+from services import shared_store, rescore_queue
+from services.llm_client import LLM_RATE_LIMIT_PER_MIN, generate_study_plan
+from services.study_planner import DEFAULT_DAYS, DEFAULT_DAILY_HOURS
 from datetime import datetime
+from services.metrics import ProfiledRoute
 
-router = APIRouter(prefix="/api/study-plan", tags=["Study Plan"])
+router = APIRouter(prefix="/api/study-plan", tags=["Study Plan"], route_class=ProfiledRoute)
 
 
 def _get_weak_topics(db: Session, student_id: int) -> list[dict]:
@@ -32,9 +35,17 @@ def _get_weak_topics(db: Session, student_id: int) -> list[dict]:
 
 
 @router.post("/{student_id}", response_model=StudyPlanOut)
-def create_study_plan(student_id: int, db: Session = Depends(get_db)):
+def create_study_plan(
+    student_id: int,
+    days: int = Query(DEFAULT_DAYS, ge=1, le=56, description="Plan length in days"),
+    daily_hours: float = Query(DEFAULT_DAILY_HOURS, ge=0.5, le=12, description="Study budget per day"),
+    db: Session = Depends(get_db),
+):
+    if LLM_RATE_LIMIT_PER_MIN and not shared_store.allow(f"llm:{student_id}", LLM_RATE_LIMIT_PER_MIN, 60):
+        raise HTTPException(status_code=429, detail="Too many generation requests, try again in a minute.")
+    rescore_queue.flush(student_id)
     weak = _get_weak_topics(db, student_id)
-    plan = generate_study_plan(weak)
+    plan = generate_study_plan(weak, days=days, daily_hours=daily_hours)
 
     sp = StudyPlan(student_id=student_id, plan_json=json.dumps(plan))
     db.add(sp)
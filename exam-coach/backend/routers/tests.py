@@ -4,12 +4,15 @@ POST /api/tests/submit
 """
 import json
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 from database import get_db, MockTest, QuestionResult
 from schemas import MockTestIn
-from services.weakness_scorer import compute_and_store_scores
+from services.revision_scheduler import update_from_test
+from services import shared_store, rescore_queue
+from services.metrics import ProfiledRoute
 
-router = APIRouter(prefix="/api/tests", tags=["Tests"])
+router = APIRouter(prefix="/api/tests", tags=["Tests"], route_class=ProfiledRoute)
 
 
 @router.post("/submit")
@@ -19,23 +22,27 @@ def submit_test(payload: MockTestIn, db: Session = Depends(get_db)):
     db.add(mt)
     db.flush()  # get mt.id
 
-    # Persist each question result
-    for q in payload.questions:
-        is_correct = q.student_answer.strip().upper() == q.correct_answer.strip().upper()
-        db.add(QuestionResult(
-            mock_test_id=mt.id,
-            subject=q.subject,
-            topic=q.topic,
-            question_id=q.question_id,
-            student_answer=q.student_answer,
-            correct_answer=q.correct_answer,
-            time_taken=q.time_taken,
-            is_correct=is_correct,
-        ))
-    db.commit()
+    # Persist each question result (one executemany rather than an INSERT per row)
+    db.execute(insert(QuestionResult), [
+        {
+            "mock_test_id": mt.id,
+            "subject": q.subject,
+            "topic": q.topic,
+            "question_id": q.question_id,
+            "student_answer": q.student_answer,
+            "correct_answer": q.correct_answer,
+            "time_taken": q.time_taken,
+            "is_correct": q.student_answer.strip().upper() == q.correct_answer.strip().upper(),
+        }
+        for q in payload.questions
+    ])
 
-    # Recompute weakness scores
-    compute_and_store_scores(db, payload.student_id, mt.id)
+    # Results and the revision schedule land in one commit; the (whole-history)
+    # weakness rescore runs inline, or is coalesced when a burst is in progress
+    update_from_test(db, payload.student_id, mt.id, commit=False)
+    db.commit()
+    shared_store.bump_student_version(payload.student_id)
+    scores_current = rescore_queue.schedule(payload.student_id)
 
     total = len(payload.questions)
     correct = sum(
@@ -43,7 +50,11 @@ def submit_test(payload: MockTestIn, db: Session = Depends(get_db)):
         if q.student_answer.strip().upper() == q.correct_answer.strip().upper()
     )
     return {
-        "message": "Test submitted and analysed successfully.",
+        "message": (
+            "Test submitted and analysed successfully." if scores_current
+            else "Test submitted; weakness scores will refresh in a moment."
+        ),
+        "scores_pending": not scores_current,
         "mock_test_id": mt.id,
         "total_questions": total,
         "correct": correct,
@@ -82,3 +82,34 @@ class ProgressOut(BaseModel):
     student_id: int
     history: List[ProgressPoint]
     topic_scores: List[TopicScoreOut]
+
+
+class RevisionItemOut(BaseModel):
+    subject: str
+    topic: str
+    easiness: float
+    interval_days: int
+    repetitions: int
+    last_quality: int
+    last_practiced_at: datetime
+    due_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class RevisionDueOut(BaseModel):
+    student_id: int
+    as_of: datetime
+    due: List[RevisionItemOut]
+
+
+class OverdueStudent(BaseModel):
+    student_id: int
+    overdue_count: int
+    oldest_due_at: datetime
+
+
+class OverdueOut(BaseModel):
+    as_of: datetime
+    students: List[OverdueStudent]
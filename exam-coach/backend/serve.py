@@ -0,0 +1,47 @@
+"""
+Production server — several uvicorn workers behind one port.
+
+Workers share the SQLite database (WAL mode) and the shared store
+(services/shared_store.py) for caches, data versions, rate limits and leases.
+The frontend is rebuilt (build_assets.py) before the workers start.
+
+    python serve.py --workers 4 --port 8000
+"""
+import os, argparse
+import uvicorn
+from database import init_db
+from build_assets import FRONTEND_DIR
+from services import static_assets, rescore_queue, metrics
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=int(os.getenv("WEB_CONCURRENCY", os.cpu_count() or 1)))
+    parser.add_argument("--log-level", default="warning")
+    parser.add_argument("--no-build", action="store_true", help="serve frontend/dist as is")
+    args = parser.parse_args()
+
+    # One-time startup work runs here; SERVE_WORKER tells the workers' startup hook to
+    # skip it, so they never race on CREATE TABLE or repeat the stale-score scan
+    init_db()
+    rescore_queue.requeue_stale()
+    metrics.reset_shared()
+    os.environ["SERVE_WORKER"] = "1"
+    if not args.no_build and FRONTEND_DIR.exists():
+        manifest = static_assets.build(FRONTEND_DIR)
+        print(f"[OK] Frontend built: {len(manifest['assets'])} fingerprinted assets")
+    print(f"[OK] Serving on http://{args.host}:{args.port} with {args.workers} workers")
+    uvicorn.run(
+        "main:app",
+        app_dir=os.path.dirname(os.path.abspath(__file__)),
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        log_level=args.log_level,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,27 @@
 """
 LLM Client — wraps the OpenAI v1 SDK with a graceful fallback to template responses.
 """
-import os, json
+import os, json, time
 from dotenv import load_dotenv
 
 load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), "..", ".env"))
 
+from services.study_planner import build_study_plan, DEFAULT_DAYS, DEFAULT_DAILY_HOURS
+from services import metrics, shared_store
+
 _API_KEY  = os.getenv("OPENAI_API_KEY", "")
 _BASE_URL = os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1")
 _MODEL    = os.getenv("LLM_MODEL", "gpt-4o-mini")
+_TIMEOUT  = float(os.getenv("LLM_TIMEOUT", "30"))
+_RETRIES  = int(os.getenv("LLM_MAX_RETRIES", "2"))
+_TIP_TTL  = float(os.getenv("LLM_TIP_CACHE_TTL", str(7 * 24 * 3600)))
+LLM_RATE_LIMIT_PER_MIN = int(os.getenv("LLM_RATE_LIMIT_PER_MIN", "0"))   # per student, 0 = off
 
 _client = None
 if _API_KEY and not _API_KEY.startswith("sk-your"):
     try:
         from openai import OpenAI
-        _client = OpenAI(api_key=_API_KEY, base_url=_BASE_URL)
+        _client = OpenAI(api_key=_API_KEY, base_url=_BASE_URL, timeout=_TIMEOUT, max_retries=_RETRIES)
     except Exception:
         _client = None
 
@@ -22,6 +29,7 @@ if _API_KEY and not _API_KEY.startswith("sk-your"):
 def _chat(system_prompt: str, user_prompt: str):
     if _client is None:
         return None
+    start = time.perf_counter()
     try:
         resp = _client.chat.completions.create(
             model=_MODEL,
@@ -32,66 +40,95 @@ def _chat(system_prompt: str, user_prompt: str):
             temperature=0.7,
             max_tokens=2000,
         )
+        metrics.observe("llm_request_duration_seconds", {"model": _MODEL}, time.perf_counter() - start)
+        metrics.inc("llm_requests_total", {"outcome": "ok"})
+        if resp.usage is not None:
+            metrics.inc("llm_tokens_total", {"kind": "prompt"}, resp.usage.prompt_tokens)
+            metrics.inc("llm_tokens_total", {"kind": "completion"}, resp.usage.completion_tokens)
         return resp.choices[0].message.content.strip()
     except Exception as e:
+        metrics.observe("llm_request_duration_seconds", {"model": _MODEL}, time.perf_counter() - start)
+        metrics.inc("llm_requests_total", {"outcome": "error"})
         print(f"[LLM error] {e}")
         return None
 
 
 # ── Study Plan ────────────────────────────────────────────────────────────────
-def generate_study_plan(weak_topics: list[dict]) -> dict:
-    """Return a 7-day plan dict. Falls back to template if no LLM."""
-    topics_summary = "\n".join(
-        f"- {t['topic']} ({t['subject']}): weakness={t['weakness_score']:.2f}, "
-        f"error_rate={t['error_rate']*100:.0f}%"
-        for t in weak_topics[:8]
-    )
+def _tip_key(subject: str, topic: str) -> str:
+    return f"tip:{subject}:{topic}"
 
-    system = (
-        "You are an expert entrance exam coach. "
-        "Respond ONLY with a valid JSON object, no markdown, no extra text. "
-        'The JSON must look like: {"days": [{"day": 1, "date_label": "Day 1", '
-        '"focus": "Topic name", "duration_hours": 2, "practice_questions": 20, '
-        '"revision_blocks": ["Block 1","Block 2"], "tip": "Motivating tip."}]}'
-    )
-    user = (
-        f"Create a 7-day personalised study plan for a student with these weak topics:\n{topics_summary}\n"
-        "Prioritise weaker topics more. Make the plan motivational, specific, and actionable. "
-        "Return ONLY valid JSON, no markdown fences."
-    )
 
-    raw = _chat(system, user)
-    if raw:
-        try:
-            # Strip markdown fences if model adds them
-            cleaned = raw.strip().lstrip("```json").lstrip("```").rstrip("```").strip()
-            return json.loads(cleaned)
-        except Exception:
-            pass
+def _template_tip(topic: str) -> str:
+    return (f"Focus on understanding the fundamentals of {topic}. "
+            f"Each mistake is a step closer to mastery! 💪")
 
-    # ── Template fallback ──────────────────────────────────────────────────
-    days = []
-    top = weak_topics[:7] if weak_topics else [{"topic": "General Revision", "subject": "All", "weakness_score": 0.5}]
-    for i in range(7):
-        t = top[i % len(top)]
-        score = t.get("weakness_score", 0.5)
-        hours = round(1.5 + score * 2.5, 1)
-        days.append({
-            "day": i + 1,
-            "date_label": f"Day {i+1}",
-            "focus": t["topic"],
-            "duration_hours": hours,
-            "practice_questions": int(15 + score * 25),
-            "revision_blocks": [
-                f"Concept review: {t['topic']}",
-                "Solve practice problems",
-                "Timed mini-test (10 questions)",
-                "Review mistakes & notes",
-            ],
-            "tip": f"Focus on understanding the fundamentals of {t['topic']}. "
-                   f"Each mistake is a step closer to mastery! 💪",
-        })
-    return {"days": days}
+
+def _topic_tips(topics: list[dict]) -> dict[tuple[str, str], str]:
+    """
+    Motivational tip per (subject, topic). Tips are cached in the shared store, so
+    every worker benefits; only uncached topics go to the LLM.
+    """
+    cached = shared_store.get_many([_tip_key(t["subject"], t["topic"]) for t in topics])
+    missing = [t for t in topics if _tip_key(t["subject"], t["topic"]) not in cached]
+    for _ in range(len(topics) - len(missing)):
+        metrics.record_cache("plan_tip", True)
+    for _ in missing:
+        metrics.record_cache("plan_tip", False)
+    if missing:
+        system = (
+            "You are an expert entrance exam coach. "
+            "Respond ONLY with a valid JSON object, no markdown, no extra text. "
+            'The JSON must look like: {"tips": [{"subject": "...", "topic": "...", '
+            '"tip": "One or two motivating, specific sentences."}]}'
+        )
+        user = (
+            "Write one short study tip for each of these topics:\n"
+            + "\n".join(f"- {t['topic']} ({t['subject']})" for t in missing)
+            + "\nReturn ONLY valid JSON, no markdown fences."
+        )
+        raw = _chat(system, user)
+        if raw:
+            try:
+                cleaned = raw.strip().lstrip("```json").lstrip("```").rstrip("```").strip()
+                fresh = {
+                    _tip_key(item["subject"], item["topic"]): item["tip"]
+                    for item in json.loads(cleaned).get("tips", [])
+                    if item.get("tip")
+                }
+                shared_store.put_many(fresh, ttl=_TIP_TTL)
+                cached.update(fresh)
+            except Exception:
+                pass
+
+    tips = {}
+    for t in topics:
+        key = (t["subject"], t["topic"])
+        if _tip_key(*key) in cached:
+            tips[key] = cached[_tip_key(*key)]
+        else:
+            metrics.inc("llm_fallback_total", {"kind": "plan_tip"})
+            tips[key] = _template_tip(t["topic"])
+    return tips
+
+
+def generate_study_plan(weak_topics: list[dict], days: int = DEFAULT_DAYS,
+                        daily_hours: float = DEFAULT_DAILY_HOURS) -> dict:
+    """
+    Return a multi-day plan dict. The schedule comes from the local optimiser;
+    the LLM (if configured) only supplies per-topic tips, which are cached.
+    """
+    plan = build_study_plan(weak_topics, days=days, daily_hours=daily_hours)
+
+    focus_topics = {}
+    for day in plan["days"]:
+        s = day["sessions"][0]
+        focus_topics[(s["subject"], s["topic"])] = {"subject": s["subject"], "topic": s["topic"]}
+    tips = _topic_tips(list(focus_topics.values()))
+
+    for day in plan["days"]:
+        s = day["sessions"][0]
+        day["tip"] = tips[(s["subject"], s["topic"])]
+    return plan
 
 
 # ── Recommendations ───────────────────────────────────────────────────────────
@@ -126,6 +163,7 @@ def generate_recommendations(weak_topics: list[dict]) -> dict:
             pass
 
     # ── Template fallback ──────────────────────────────────────────────────
+    metrics.inc("llm_fallback_total", {"kind": "recommendations"})
     recs = []
     for t in weak_topics[:6]:
         recs.append({
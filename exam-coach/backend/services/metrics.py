@@ -0,0 +1,359 @@
+"""
+Metrics — counters/histograms rendered in Prometheus text format.
+
+Covers per-route request latency, DB query count/time per request (via SQLAlchemy
+cursor events, with an N+1 warning), LLM latency/tokens, template-fallback hits and
+cache hit ratios.  An opt-in sampling profiler (METRICS_PROFILE=1) writes folded
+stacks (`frame;frame;frame count`, flamegraph.pl-ready) for requests slower than
+METRICS_PROFILE_SLOW_MS into METRICS_PROFILE_DIR.  A request's profile only holds
+samples from the threadpool thread running its endpoint (routers use `ProfiledRoute`,
+which claims that thread for exactly the duration of the call), so concurrent
+requests do not bleed into each other; dependencies, async endpoints and the shared
+event-loop thread are not attributed.
+
+Each process records into its own tables and publishes a snapshot of them to the
+shared store every METRICS_PUBLISH_S seconds; `render()` sums every process's
+snapshot, so a scrape answered by any uvicorn worker reports the whole server.
+Snapshots of workers that have exited are kept so totals never go backwards;
+`reset_shared()` clears them when the server starts.
+"""
+import os, sys, time, asyncio, functools, itertools, threading, contextvars
+from collections import defaultdict, Counter
+from fastapi import Request
+from fastapi.routing import APIRoute
+from services import shared_store
+
+QUERY_WARN_THRESHOLD  = int(os.getenv("METRICS_QUERY_WARN", "50"))
+REPEAT_WARN_THRESHOLD = int(os.getenv("METRICS_REPEAT_WARN", "10"))
+PROFILE_ENABLED  = os.getenv("METRICS_PROFILE", "0") == "1"
+PROFILE_SLOW_MS  = float(os.getenv("METRICS_PROFILE_SLOW_MS", "500"))
+PROFILE_INTERVAL = float(os.getenv("METRICS_PROFILE_INTERVAL_MS", "5")) / 1000
+PROFILE_DIR      = os.getenv(
+    "METRICS_PROFILE_DIR", os.path.join(os.path.dirname(__file__), "..", "profiles")
+)
+PUBLISH_INTERVAL = float(os.getenv("METRICS_PUBLISH_S", "5"))
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS   = (1, 2, 5, 10, 20, 50, 100, 250, 1000)
+
+_HISTOGRAMS = {
+    "http_request_duration_seconds": ("HTTP request latency by route.", LATENCY_BUCKETS),
+    "db_queries_per_request": ("SQL statements executed per HTTP request.", COUNT_BUCKETS),
+    "db_time_per_request_seconds": ("Time spent in SQL per HTTP request.", LATENCY_BUCKETS),
+    "llm_request_duration_seconds": ("LLM chat completion latency.", LATENCY_BUCKETS),
+}
+_COUNTERS = {
+    "http_requests_total": "HTTP requests by route and status.",
+    "db_queries_total": "SQL statements executed.",
+    "db_n_plus_one_suspected_total": "Requests that exceeded the query budget or repeated one statement.",
+    "llm_requests_total": "LLM calls by outcome.",
+    "llm_tokens_total": "LLM tokens by kind.",
+    "llm_fallback_total": "Template fallbacks used instead of an LLM response.",
+    "cache_requests_total": "Cache lookups by cache and result.",
+    "retention_rows_deleted_total": "Rows removed by the retention job, by table.",
+    "retention_bytes_reclaimed_total": "Bytes returned to the filesystem by VACUUM.",
+    "rescore_batches_total": "Debounced weakness-rescore batches committed.",
+    "rescore_students_total": "Students rescored by those batches.",
+    "rescore_coalesced_total": "Submissions folded into an already-pending rescore.",
+}
+
+_lock = threading.Lock()
+_counters: dict[str, dict[tuple, float]] = defaultdict(lambda: defaultdict(float))
+_histograms: dict[str, dict[tuple, list]] = defaultdict(dict)   # labels -> [bucket counts..., sum, count]
+
+_SNAPSHOT_PREFIX = "metrics:"
+_SNAPSHOT_KEY = f"{_SNAPSHOT_PREFIX}{os.getpid()}:{int(time.time() * 1000)}"   # this process
+
+
+def _key(labels: dict) -> tuple:
+    return tuple(sorted(labels.items()))
+
+
+def inc(name: str, labels: dict = None, value: float = 1):
+    with _lock:
+        _counters[name][_key(labels or {})] += value
+
+
+def observe(name: str, labels: dict, value: float):
+    buckets = _HISTOGRAMS[name][1]
+    with _lock:
+        series = _histograms[name].setdefault(_key(labels), [0] * len(buckets) + [0.0, 0])
+        for i, b in enumerate(buckets):
+            if value <= b:
+                series[i] += 1
+        series[-2] += value
+        series[-1] += 1
+
+
+def record_cache(cache: str, hit: bool):
+    inc("cache_requests_total", {"cache": cache, "result": "hit" if hit else "miss"})
+
+
+def _fmt_labels(key: tuple, extra: tuple = ()) -> str:
+    items = list(key) + list(extra)
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{str(v)}"' for k, v in items) + "}"
+
+
+def publish():
+    """Write this process's counters and histograms to the shared store."""
+    with _lock:
+        snapshot = {
+            "counters": {name: [[key, v] for key, v in series.items()] for name, series in _counters.items()},
+            "histograms": {name: [[key, list(v)] for key, v in series.items()] for name, series in _histograms.items()},
+        }
+    shared_store.put(_SNAPSHOT_KEY, snapshot)
+
+
+def _merged() -> tuple[dict, dict]:
+    """Every process's published snapshot (this one's refreshed first), summed per series."""
+    publish()
+    counters = defaultdict(lambda: defaultdict(float))
+    histograms = defaultdict(dict)
+    for snapshot in shared_store.get_prefix(_SNAPSHOT_PREFIX).values():
+        for name, series in snapshot["counters"].items():
+            for key, v in series:
+                counters[name][tuple(map(tuple, key))] += v
+        for name, series in snapshot["histograms"].items():
+            for key, values in series:
+                total = histograms[name].setdefault(tuple(map(tuple, key)), [0] * len(values))
+                for i, v in enumerate(values):
+                    total[i] += v
+    return counters, histograms
+
+
+def render() -> str:
+    """All metrics, summed over every worker, in Prometheus text exposition format."""
+    counters, histograms = _merged()
+    lines = []
+    for name, help_text in _COUNTERS.items():
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+        for key, v in sorted(counters[name].items()):
+            lines.append(f"{name}{_fmt_labels(key)} {v:g}")
+    for name, (help_text, buckets) in _HISTOGRAMS.items():
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+        for key, series in sorted(histograms[name].items()):
+            for b, c in zip(buckets, series):
+                lines.append(f"{name}_bucket{_fmt_labels(key, (('le', f'{b:g}'),))} {c}")
+            lines.append(f"{name}_bucket{_fmt_labels(key, (('le', '+Inf'),))} {series[-1]}")
+            lines.append(f"{name}_sum{_fmt_labels(key)} {series[-2]:.6f}")
+            lines.append(f"{name}_count{_fmt_labels(key)} {series[-1]}")
+    return "\n".join(lines) + "\n"
+
+
+def reset_shared():
+    """Forget every process's published snapshot (server start: totals begin at zero)."""
+    shared_store.drop_prefix(_SNAPSHOT_PREFIX)
+
+
+_stop = threading.Event()
+
+
+def start_background():
+    """Publish this process's snapshot every PUBLISH_INTERVAL seconds."""
+    _stop.clear()
+
+    def loop():
+        while not _stop.wait(PUBLISH_INTERVAL):
+            try:
+                publish()
+            except Exception as e:
+                print(f"[metrics error] {e}")
+
+    threading.Thread(target=loop, name="metrics-publish", daemon=True).start()
+
+
+def stop_background():
+    _stop.set()
+    publish()
+
+
+# ── DB instrumentation ────────────────────────────────────────────────────────
+# Holds a mutable per-request dict so stats recorded in threadpool workers
+# (which run on a copy of the context) are visible to the middleware.
+_request_stats: contextvars.ContextVar = contextvars.ContextVar("request_stats", default=None)
+
+
+def instrument_engine(engine):
+    """Attach cursor-execute hooks that count and time every SQL statement."""
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        inc("db_queries_total")
+        stats = _request_stats.get()
+        if stats is not None:
+            stats["queries"] += 1
+            stats["db_time"] += elapsed
+            stats["statements"][statement] += 1
+
+
+# ── Sampling profiler ─────────────────────────────────────────────────────────
+_IDLE_FILES = ("threading.py", "queue.py", "selectors.py")
+
+
+class _Sampler:
+    """
+    Samples thread stacks while at least one request is in flight. Each stack is
+    credited to the request that currently owns its thread; unowned threads
+    (the event loop, idle pool workers) are ignored.
+    """
+
+    def __init__(self):
+        self._active: dict[int, Counter] = {}
+        self._owner: dict[int, int] = {}   # thread ident -> request id
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+
+    def start_request(self, rid: int):
+        with self._lock:
+            self._active[rid] = Counter()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="metrics-sampler", daemon=True)
+                self._thread.start()
+        self._wake.set()
+
+    def claim(self, rid: int):
+        """Attribute the calling thread's samples to request `rid` until `release()`."""
+        with self._lock:
+            self._owner[threading.get_ident()] = rid
+
+    def release(self):
+        with self._lock:
+            self._owner.pop(threading.get_ident(), None)
+
+    def end_request(self, rid: int) -> Counter:
+        with self._lock:
+            for tid in [t for t, r in self._owner.items() if r == rid]:
+                del self._owner[tid]
+            return self._active.pop(rid, Counter())
+
+    def _run(self):
+        me = threading.get_ident()
+        while True:
+            with self._lock:
+                idle = not self._active
+                if idle:
+                    self._wake.clear()
+            if idle:
+                self._wake.wait()
+                continue
+            with self._lock:
+                owners = dict(self._owner)
+            stacks = []
+            for tid, frame in sys._current_frames().items():
+                if tid == me or tid not in owners or os.path.basename(frame.f_code.co_filename) in _IDLE_FILES:
+                    continue
+                names = []
+                while frame is not None:
+                    names.append(f"{frame.f_code.co_name} ({os.path.basename(frame.f_code.co_filename)}:{frame.f_lineno})")
+                    frame = frame.f_back
+                stacks.append((owners[tid], ";".join(reversed(names))))
+            with self._lock:
+                for rid, stack in stacks:
+                    samples = self._active.get(rid)
+                    if samples is not None:
+                        samples[stack] += 1
+            time.sleep(PROFILE_INTERVAL)
+
+
+_sampler = _Sampler() if PROFILE_ENABLED else None
+_dump_seq = itertools.count()
+
+
+def _dump_profile(route: str, elapsed: float, samples: Counter):
+    if not samples:
+        return
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    safe = route.strip("/").replace("/", "_").replace("{", "").replace("}", "") or "root"
+    # pid + sequence keep concurrent dumps (and other workers' dumps) from overwriting each other
+    name = f"{int(time.time() * 1000)}_{safe}_{int(elapsed * 1000)}ms_{os.getpid()}-{next(_dump_seq)}.folded"
+    path = os.path.join(PROFILE_DIR, name)
+    with open(path, "w", encoding="utf-8") as f:
+        for stack, count in samples.most_common():
+            f.write(f"{stack} {count}\n")
+    print(f"[metrics] slow request {route} ({elapsed*1000:.0f} ms) → {path}")
+
+
+def _profiled(endpoint):
+    """Wrap a sync endpoint so the threadpool thread running it is claimed for its request."""
+    @functools.wraps(endpoint)
+    def wrapper(*args, **kwargs):
+        stats = _request_stats.get()
+        if _sampler is None or stats is None:
+            return endpoint(*args, **kwargs)
+        _sampler.claim(stats["rid"])
+        try:
+            return endpoint(*args, **kwargs)
+        finally:
+            _sampler.release()
+    wrapper.profiled = True
+    return wrapper
+
+
+class ProfiledRoute(APIRoute):
+    """
+    APIRoute whose sync endpoint claims its thread for the sampling profiler.
+    FastAPI runs each sync dependency and the endpoint in separate threadpool
+    calls, so only the endpoint call itself can know which thread is its own.
+    """
+
+    def __init__(self, path: str, endpoint, **kwargs):
+        # include_router() rebuilds routes from the already-wrapped endpoint
+        if not asyncio.iscoroutinefunction(endpoint) and not getattr(endpoint, "profiled", False):
+            endpoint = _profiled(endpoint)
+        super().__init__(path, endpoint, **kwargs)
+
+
+# ── HTTP middleware ───────────────────────────────────────────────────────────
+_route_paths: dict = {}
+
+
+def _route_label(request: Request) -> str:
+    """Templated route path (e.g. /api/analysis/{student_id}) to keep label cardinality bounded."""
+    if not _route_paths:
+        for r in request.app.routes:
+            endpoint = getattr(r, "endpoint", None) or getattr(r, "app", None)
+            _route_paths[endpoint] = r.path
+    return _route_paths.get(request.scope.get("endpoint"), "unmatched")
+
+
+async def metrics_middleware(request: Request, call_next):
+    stats = {"queries": 0, "db_time": 0.0, "statements": Counter()}
+    rid = stats["rid"] = id(stats)
+    token = _request_stats.set(stats)
+    if _sampler:
+        _sampler.start_request(rid)
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        elapsed = time.perf_counter() - start
+        _request_stats.reset(token)
+        route = _route_label(request)
+        labels = {"method": request.method, "route": route}
+        inc("http_requests_total", {**labels, "status": status})
+        observe("http_request_duration_seconds", labels, elapsed)
+        observe("db_queries_per_request", labels, stats["queries"])
+        observe("db_time_per_request_seconds", labels, stats["db_time"])
+
+        most_repeated = max(stats["statements"].values(), default=0)
+        if stats["queries"] > QUERY_WARN_THRESHOLD or most_repeated > REPEAT_WARN_THRESHOLD:
+            inc("db_n_plus_one_suspected_total", labels)
+            print(f"[metrics] possible N+1 on {request.method} {route}: "
+                  f"{stats['queries']} queries, one statement repeated {most_repeated}×")
+
+        if _sampler:
+            samples = _sampler.end_request(rid)
+            if elapsed * 1000 >= PROFILE_SLOW_MS:
+                _dump_profile(route, elapsed, samples)
@@ -0,0 +1,252 @@
+"""
+Rescore Queue — debounced, batched weakness rescoring.
+
+Rescoring is a full pass over the student's history, and when proctoring software
+flushes a class the same student can get several submits within seconds. The
+debounce is leading + trailing edge: a student's first submit is rescored inline,
+so a lone submission is analysed before its response returns; submits arriving
+within RESCORE_DEBOUNCE_MS of that are coalesced into one trailing rescore, run
+RESCORE_DEBOUNCE_MS after the last of them (or RESCORE_MAX_WAIT_MS after the first,
+so a steady stream cannot starve it).
+
+A coalesced submit also leaves a pending marker in the shared store
+(`rescore_pending:{student_id}` = the student's data version), so every worker can
+see it. Readers of TopicScore call `flush()` first, which rescores the student now
+if they are marked, whichever worker took the submit. A rescore clears a marker
+only if it still holds the version read before scoring, so a submit that lands
+mid-rescore stays pending. The debounce timing itself is per worker: bursts are
+coalesced among the submits one worker receives.
+
+A background thread handles all due students in one batch, skipping any that
+another worker's `flush()` already rescored. It reads first, then writes every
+student's scores in a single short transaction. The write lock is held for one
+commit per batch, not one per submission. Readers keep seeing the previous
+complete set of scores until that commit lands, then the new one.
+
+Markers outlive the process that wrote them. At startup `requeue_stale()` also
+marks every student whose latest test is newer than their scores (e.g. an inline
+rescore cut short by a crash). RESCORE_DEBOUNCE_MS=0 rescores every submit inline.
+"""
+import os, time, threading
+from sqlalchemy import func
+from database import SessionLocal, MockTest, TopicScore
+from services import metrics, shared_store
+from services.weakness_scorer import compute_scores, store_scores
+
+DEBOUNCE_S = float(os.getenv("RESCORE_DEBOUNCE_MS", "2000")) / 1000
+MAX_WAIT_S = float(os.getenv("RESCORE_MAX_WAIT_MS", "10000")) / 1000
+BATCH_SIZE = int(os.getenv("RESCORE_BATCH_SIZE", "200"))
+
+_cond = threading.Condition()
+_pending: dict[int, tuple[float, float]] = {}   # student_id -> (first_seen, last_seen)
+_recent: dict[int, float] = {}                  # student_id -> time of last inline rescore
+_in_flight: set[int] = set()                    # students in the batch the thread is rescoring
+_thread: threading.Thread = None
+_stopping = False
+
+
+def _marker(student_id: int) -> str:
+    return f"rescore_pending:{student_id}"
+
+
+def rescore_now(student_ids: list[int], only_marked: bool = False):
+    """
+    Recompute and store scores for `student_ids` in one transaction, then clear
+    their pending markers. With `only_marked`, students no longer marked pending
+    (already rescored by another worker) are skipped.
+    """
+    if not student_ids:
+        return
+    # Read markers before scoring: a submit committed after this re-marks the student
+    marks = shared_store.get_many([_marker(sid) for sid in student_ids])
+    if only_marked:
+        student_ids = [sid for sid in student_ids if _marker(sid) in marks]
+        if not student_ids:
+            return
+    db = SessionLocal()
+    try:
+        scores = {sid: compute_scores(db, sid) for sid in student_ids}
+        db.rollback()   # end the read transaction before taking the write lock
+        for sid, raw in scores.items():
+            store_scores(db, sid, raw)
+        db.commit()
+    finally:
+        db.close()
+    for sid in student_ids:
+        shared_store.bump_student_version(sid)
+        if _marker(sid) in marks:
+            shared_store.drop_if(_marker(sid), marks[_marker(sid)])
+    metrics.inc("rescore_batches_total")
+    metrics.inc("rescore_students_total", value=len(student_ids))
+
+
+def schedule(student_id: int) -> bool:
+    """
+    Rescore `student_id` after a submission. Returns True if the scores are already
+    current (rescored inline), False if the rescore was coalesced into a pending one.
+    """
+    now = time.monotonic()
+    with _cond:
+        burst = DEBOUNCE_S > 0 and (
+            student_id in _pending or now - _recent.get(student_id, -DEBOUNCE_S) < DEBOUNCE_S
+        )
+        if not burst:
+            _recent[student_id] = now
+            if len(_recent) > 10 * BATCH_SIZE:
+                for sid, t in list(_recent.items()):
+                    if now - t >= DEBOUNCE_S:
+                        del _recent[sid]
+    if not burst:
+        rescore_now([student_id])
+        return True
+
+    shared_store.put(_marker(student_id), shared_store.student_version(student_id))
+    with _cond:
+        if student_id in _pending:
+            metrics.inc("rescore_coalesced_total")
+        first_seen = _pending.get(student_id, (now, now))[0]
+        _pending[student_id] = (first_seen, now)
+        _ensure_thread()
+        _cond.notify_all()
+    return False
+
+
+def flush(student_id: int):
+    """
+    Make `student_id`'s scores current before they are read: wait for a batch that
+    has them in flight, then rescore now if they are still marked pending (by this
+    worker or any other).
+    """
+    with _cond:
+        entry = _pending.pop(student_id, None)
+        if entry is None:
+            _cond.wait_for(lambda: student_id not in _in_flight, timeout=30)
+    try:
+        rescore_now([student_id], only_marked=True)
+    except Exception:
+        if entry is not None:
+            with _cond:   # leave it pending, as _loop does, so the thread retries it
+                _pending.setdefault(student_id, entry)
+                _ensure_thread()
+                _cond.notify_all()
+        raise
+
+
+def _deadline(first_seen: float, last_seen: float) -> float:
+    return min(last_seen + DEBOUNCE_S, first_seen + MAX_WAIT_S)
+
+
+def _take_due(force: bool = False) -> tuple[list[int], float]:
+    """Pop up to BATCH_SIZE due students. Returns (ids, seconds until the next is due)."""
+    now = time.monotonic()
+    due, wait = [], None
+    for sid, (first_seen, last_seen) in list(_pending.items()):
+        deadline = _deadline(first_seen, last_seen)
+        if (force or deadline <= now) and len(due) < BATCH_SIZE:
+            due.append(sid)
+            del _pending[sid]
+        else:
+            wait = max(0.0, deadline - now) if wait is None else min(wait, max(0.0, deadline - now))
+    return due, wait
+
+
+def _loop():
+    while True:
+        with _cond:
+            due, wait = _take_due(force=_stopping)
+            if not due:
+                if _stopping:
+                    return
+                _cond.wait(wait)
+                continue
+            _in_flight.update(due)
+        try:
+            rescore_now(due, only_marked=True)
+        except Exception as e:
+            print(f"[rescore error] {e}")
+            with _cond:   # retry after another debounce window (not while shutting down)
+                if not _stopping:
+                    now = time.monotonic()
+                    for sid in due:
+                        _pending.setdefault(sid, (now, now))
+        finally:
+            with _cond:
+                _in_flight.difference_update(due)
+                _cond.notify_all()
+
+
+def _ensure_thread():
+    global _thread
+    if _thread is None or not _thread.is_alive():
+        _thread = threading.Thread(target=_loop, name="rescore", daemon=True)
+        _thread.start()
+
+
+def pending() -> int:
+    with _cond:
+        return len(_pending)
+
+
+def drain(timeout: float = 60) -> bool:
+    """Rescore everything pending now and wait for in-flight batches (benchmarks, tests)."""
+    with _cond:
+        due = list(_pending)
+        _pending.clear()
+    for i in range(0, len(due), BATCH_SIZE):
+        rescore_now(due[i:i + BATCH_SIZE], only_marked=True)
+    with _cond:
+        return _cond.wait_for(lambda: not _in_flight and not _pending, timeout)
+
+
+def requeue_stale() -> list[int]:
+    """Mark every student whose scores are older than their latest test as pending."""
+    db = SessionLocal()
+    try:
+        scored = (
+            db.query(TopicScore.student_id, func.max(TopicScore.updated_at).label("scored_at"))
+            .group_by(TopicScore.student_id)
+            .subquery()
+        )
+        stale = [
+            sid for (sid,) in
+            db.query(MockTest.student_id)
+            .outerjoin(scored, scored.c.student_id == MockTest.student_id)
+            .group_by(MockTest.student_id)
+            .having((func.max(scored.c.scored_at).is_(None))
+                    | (func.max(MockTest.submitted_at) > func.max(scored.c.scored_at)))
+            .all()
+        ]
+    finally:
+        db.close()
+    shared_store.put_many({_marker(sid): shared_store.student_version(sid) for sid in stale})
+    if stale:
+        print(f"[OK] Requeued {len(stale)} students with stale weakness scores")
+    return stale
+
+
+def start_background(requeue: bool = True):
+    """
+    Start the flusher and (with `requeue`) requeue students whose scores are older
+    than their latest test. serve.py requeues once for all workers.
+    """
+    global _stopping
+    stale = requeue_stale() if requeue else []
+    if DEBOUNCE_S <= 0:
+        return   # readers' flush() picks the marked students up
+    with _cond:
+        _stopping = False
+        now = time.monotonic()
+        for sid in stale:
+            _pending.setdefault(sid, (now, now))
+        _ensure_thread()
+        _cond.notify_all()
+
+
+def stop_background(timeout: float = 30):
+    """Flush everything still pending, then stop the thread."""
+    global _stopping
+    with _cond:
+        _stopping = True
+        _cond.notify_all()
+    if _thread is not None:
+        _thread.join(timeout)
@@ -0,0 +1,243 @@
+"""
+Retention Service — bounded history for plans, recommendations and question results.
+
+Each pass (run by a background thread, or on demand via the admin router):
+  1. keeps only the newest RETENTION_KEEP_PLANS study plans and
+     RETENTION_KEEP_RECOMMENDATIONS recommendations per student;
+  2. archives tests older than RETENTION_RAW_DAYS, a batch at a time: their
+     question_results are folded into TestSummary / TopicRollup rows and deleted
+     (raw_json is dropped too);
+  3. VACUUMs once enough pages are free, reporting the bytes reclaimed.
+"""
+import os, time, uuid, threading
+from datetime import datetime, timedelta
+from sqlalchemy import func, select, delete, text, Integer
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+from database import (
+    SessionLocal, engine, MockTest, QuestionResult, StudyPlan, Recommendation,
+    TestSummary, TopicRollup,
+)
+from services import metrics, shared_store
+
+KEEP_PLANS           = int(os.getenv("RETENTION_KEEP_PLANS", "10"))
+KEEP_RECOMMENDATIONS = int(os.getenv("RETENTION_KEEP_RECOMMENDATIONS", "10"))
+RAW_DAYS             = int(os.getenv("RETENTION_RAW_DAYS", "90"))
+BATCH_TESTS          = int(os.getenv("RETENTION_BATCH_TESTS", "500"))
+INTERVAL_MIN         = float(os.getenv("RETENTION_INTERVAL_MIN", "60"))
+VACUUM_MIN_FREE_MB   = float(os.getenv("RETENTION_VACUUM_MIN_FREE_MB", "16"))
+ENABLED              = os.getenv("RETENTION_ENABLED", "1") == "1"
+
+_REPORT_KEY = "retention:last_report"   # in the shared store, so every worker serves the same one
+_PASS_LEASE = "retention:pass"           # held while any worker is running a pass
+_PASS_LEASE_S = 600                      # renewed after every archive batch
+
+
+# ── Pruning ───────────────────────────────────────────────────────────────────
+def prune_history(db: Session, model, keep: int) -> int:
+    """Delete all but the newest `keep` rows per student. Returns rows deleted."""
+    ranked = (
+        select(
+            model.id,
+            func.row_number().over(
+                partition_by=model.student_id,
+                order_by=(model.created_at.desc(), model.id.desc()),
+            ).label("rn"),
+        )
+        .subquery()
+    )
+    stale = select(ranked.c.id).where(ranked.c.rn > keep)
+    result = db.execute(delete(model).where(model.id.in_(stale)))
+    db.commit()
+    return result.rowcount or 0
+
+
+# ── Roll-ups ──────────────────────────────────────────────────────────────────
+def archive_tests(db: Session, older_than: datetime, limit: int = BATCH_TESTS) -> tuple[int, int]:
+    """
+    Fold the question_results of up to `limit` not-yet-archived tests submitted
+    before `older_than` into TestSummary / TopicRollup, then delete them.
+    All in one transaction so readers never see a test half-archived.
+    Returns (tests_archived, question_results_deleted).
+    """
+    test_ids = [
+        tid for (tid,) in
+        db.query(MockTest.id)
+        .outerjoin(TestSummary, TestSummary.mock_test_id == MockTest.id)
+        .filter(MockTest.submitted_at < older_than, TestSummary.id.is_(None))
+        .order_by(MockTest.id)
+        .limit(limit)
+        .all()
+    ]
+    if not test_ids:
+        return 0, 0
+
+    per_test = (
+        db.query(
+            MockTest.id, MockTest.student_id,
+            func.count(QuestionResult.id),
+            func.coalesce(func.sum(QuestionResult.is_correct, type_=Integer), 0),
+            func.coalesce(func.sum(QuestionResult.time_taken), 0.0),
+        )
+        .outerjoin(QuestionResult, QuestionResult.mock_test_id == MockTest.id)
+        .filter(MockTest.id.in_(test_ids))
+        .group_by(MockTest.id, MockTest.student_id)
+        .all()
+    )
+    db.add_all([
+        TestSummary(mock_test_id=tid, student_id=sid, total_questions=total,
+                    correct=int(correct), time_sum=float(time_sum))
+        for tid, sid, total, correct, time_sum in per_test
+    ])
+
+    per_topic = (
+        db.query(
+            MockTest.student_id, QuestionResult.subject, QuestionResult.topic,
+            func.count(QuestionResult.id),
+            func.sum(QuestionResult.is_correct, type_=Integer),
+            func.sum(QuestionResult.time_taken),
+            func.max(QuestionResult.time_taken),
+        )
+        .join(QuestionResult.mock_test)
+        .filter(MockTest.id.in_(test_ids))
+        .group_by(MockTest.student_id, QuestionResult.subject, QuestionResult.topic)
+        .all()
+    )
+    student_ids = {row[0] for row in per_topic}
+    existing = {
+        (r.student_id, r.subject, r.topic): r
+        for r in db.query(TopicRollup).filter(TopicRollup.student_id.in_(student_ids)).all()
+    }
+    now = datetime.utcnow()
+    for sid, subject, topic, total, correct, time_sum, time_max in per_topic:
+        rollup = existing.get((sid, subject, topic))
+        if rollup is None:
+            rollup = TopicRollup(student_id=sid, subject=subject, topic=topic,
+                                 total=0, correct=0, time_sum=0.0, time_max=0.0)
+            db.add(rollup)
+        rollup.total += total
+        rollup.correct += int(correct or 0)
+        rollup.time_sum += float(time_sum or 0)
+        rollup.time_max = max(rollup.time_max, float(time_max or 0))
+        rollup.updated_at = now
+
+    deleted = db.execute(delete(QuestionResult).where(QuestionResult.mock_test_id.in_(test_ids))).rowcount or 0
+    db.query(MockTest).filter(MockTest.id.in_(test_ids)).update({MockTest.raw_json: None}, synchronize_session=False)
+    db.commit()
+    return len(test_ids), deleted
+
+
+# ── Compaction ────────────────────────────────────────────────────────────────
+def _pragma(conn, name: str) -> int:
+    return conn.execute(text(f"PRAGMA {name}")).scalar() or 0
+
+
+def compact(min_free_mb: float = VACUUM_MIN_FREE_MB) -> dict:
+    """VACUUM the SQLite file if at least `min_free_mb` sits on the freelist."""
+    with engine.connect() as conn:
+        page_size = _pragma(conn, "page_size")
+        before = _pragma(conn, "page_count") * page_size
+        free = _pragma(conn, "freelist_count") * page_size
+    report = {"size_before": before, "free_before": free, "vacuumed": False, "bytes_reclaimed": 0}
+    if free < min_free_mb * 1024 * 1024:
+        return report
+
+    try:
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.execute(text("VACUUM"))
+            after = _pragma(conn, "page_count") * page_size
+    except OperationalError as e:
+        # VACUUM needs an exclusive lock; SQLITE_BUSY just means "try next pass"
+        report["error"] = str(e.orig)
+        return report
+    report.update(vacuumed=True, size_after=after, bytes_reclaimed=before - after)
+    return report
+
+
+# ── Orchestration ─────────────────────────────────────────────────────────────
+def run_retention(max_batches: int = None, vacuum: bool = True) -> dict | None:
+    """
+    One full retention pass. Archiving proceeds in BATCH_TESTS-sized transactions
+    until nothing old is left (or `max_batches` is reached). Returns None without
+    doing anything if another pass, in any worker, is already running: two passes
+    would pick the same tests to archive.
+    """
+    owner = uuid.uuid4().hex
+    if not shared_store.acquire_lease(_PASS_LEASE, _PASS_LEASE_S, owner):
+        return None
+    try:
+        return _run_pass(owner, max_batches, vacuum)
+    finally:
+        shared_store.release_lease(_PASS_LEASE, owner)
+
+
+def _run_pass(owner: str, max_batches: int, vacuum: bool) -> dict:
+    start = time.perf_counter()
+    report = {"started_at": datetime.utcnow().isoformat(timespec="seconds")}
+
+    db = SessionLocal()
+    try:
+        report["plans_deleted"] = prune_history(db, StudyPlan, KEEP_PLANS)
+        report["recommendations_deleted"] = prune_history(db, Recommendation, KEEP_RECOMMENDATIONS)
+
+        cutoff = datetime.utcnow() - timedelta(days=RAW_DAYS)
+        tests_archived = results_deleted = batches = 0
+        while max_batches is None or batches < max_batches:
+            n_tests, n_results = archive_tests(db, cutoff)
+            if not n_tests:
+                break
+            tests_archived += n_tests
+            results_deleted += n_results
+            batches += 1
+            shared_store.acquire_lease(_PASS_LEASE, _PASS_LEASE_S, owner)
+        report.update(tests_archived=tests_archived, question_results_deleted=results_deleted)
+    finally:
+        db.close()
+
+    report["compaction"] = compact() if vacuum else None
+    report["seconds"] = round(time.perf_counter() - start, 3)
+
+    metrics.inc("retention_rows_deleted_total", {"table": "study_plans"}, report["plans_deleted"])
+    metrics.inc("retention_rows_deleted_total", {"table": "recommendations"}, report["recommendations_deleted"])
+    metrics.inc("retention_rows_deleted_total", {"table": "question_results"}, results_deleted)
+    if report["compaction"]:
+        metrics.inc("retention_bytes_reclaimed_total", value=report["compaction"]["bytes_reclaimed"])
+
+    print(f"[retention] archived {tests_archived} tests / {results_deleted} results, "
+          f"pruned {report['plans_deleted']} plans + {report['recommendations_deleted']} recs, "
+          f"reclaimed {(report['compaction'] or {}).get('bytes_reclaimed', 0)} bytes")
+    shared_store.put(_REPORT_KEY, report)
+    return report
+
+
+def last_report() -> dict:
+    """The most recent pass's report, from whichever worker ran it."""
+    return shared_store.get(_REPORT_KEY, {})
+
+
+_stop = threading.Event()
+
+
+def start_background():
+    """
+    Run a retention pass every INTERVAL_MIN minutes on a daemon thread. With several
+    workers, a shared-store lease makes sure only one of them does the work.
+    """
+    if not ENABLED:
+        return
+    _stop.clear()
+
+    def loop():
+        while not _stop.wait(INTERVAL_MIN * 60):
+            try:
+                if not shared_store.acquire_lease("retention", INTERVAL_MIN * 60 * 1.5):
+                    continue
+                run_retention()
+            except Exception as e:
+                print(f"[retention error] {e}")
+
+    threading.Thread(target=loop, name="retention", daemon=True).start()
+
+
+def stop_background():
+    _stop.set()
@@ -0,0 +1,125 @@
+"""
+Revision Scheduler — SM-2 spaced repetition per (student, topic).
+
+Each submitted test grades every topic it covered on the SM-2 0-5 scale (from the
+topic's accuracy in that test). A topic that is due is reviewed: its interval grows or
+resets and `due_at` moves accordingly. A topic practised before it is due only has the
+grade recorded, unless it was failed, which resets it like any lapse; so a burst of
+tests cannot inflate intervals that have not elapsed.
+"What is due" queries are range scans on the (student_id, due_at) / due_at indexes.
+"""
+from sqlalchemy import func, Integer
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+from database import QuestionResult, RevisionItem
+from datetime import datetime, timedelta
+
+MIN_EASINESS = 1.3
+PASS_QUALITY = 3
+MAX_INTERVAL_DAYS = 365  # SM-2 intervals grow geometrically; cap them well short of datetime's range
+
+
+def quality_from_accuracy(correct: int, total: int) -> int:
+    """Map a topic's accuracy in one test onto the SM-2 0-5 grade."""
+    if not total:
+        return 0
+    return int(round(correct / total * 5))
+
+
+def sm2_step(easiness: float, interval_days: int, repetitions: int, quality: int) -> tuple[float, int, int]:
+    """One SM-2 review. Returns the new (easiness, interval_days, repetitions)."""
+    if quality >= PASS_QUALITY:
+        if repetitions == 0:
+            interval_days = 1
+        elif repetitions == 1:
+            interval_days = 6
+        else:
+            interval_days = min(MAX_INTERVAL_DAYS, int(round(interval_days * easiness)))
+        repetitions += 1
+    else:
+        repetitions = 0
+        interval_days = 1
+
+    easiness += 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02)
+    return max(MIN_EASINESS, easiness), interval_days, repetitions
+
+
+def update_from_test(db: Session, student_id: int, mock_test_id: int, now: datetime = None,
+                     commit: bool = True):
+    """
+    Advance the schedule for every topic in `mock_test_id` in a single pass:
+    one aggregate query for the grades, one insert-or-ignore for new topics,
+    one query for the items, one commit (left to the caller when `commit=False`).
+    """
+    now = now or datetime.utcnow()
+
+    graded = (
+        db.query(
+            QuestionResult.subject, QuestionResult.topic,
+            func.count(QuestionResult.id),
+            func.sum(QuestionResult.is_correct, type_=Integer),
+        )
+        .filter(QuestionResult.mock_test_id == mock_test_id)
+        .group_by(QuestionResult.subject, QuestionResult.topic)
+        .all()
+    )
+    if not graded:
+        return
+
+    # Create missing items up front; ON CONFLICT keeps concurrent submissions
+    # for the same student from tripping the unique constraint.
+    db.execute(
+        insert(RevisionItem).on_conflict_do_nothing(),
+        [
+            {"student_id": student_id, "subject": subject, "topic": topic,
+             "easiness": 2.5, "interval_days": 0, "repetitions": 0,
+             "last_practiced_at": now, "due_at": now}
+            for subject, topic, _, _ in graded
+        ],
+    )
+    existing = {
+        (it.subject, it.topic): it
+        for it in db.query(RevisionItem).filter_by(student_id=student_id).all()
+    }
+
+    for subject, topic, total, correct in graded:
+        item = existing[(subject, topic)]
+        quality = quality_from_accuracy(int(correct or 0), total)
+        item.last_quality = quality
+        item.last_practiced_at = now
+        if now < item.due_at and quality >= PASS_QUALITY:
+            continue   # early pass: keep the schedule
+        item.easiness, item.interval_days, item.repetitions = sm2_step(
+            item.easiness, item.interval_days, item.repetitions, quality
+        )
+        item.due_at = now + timedelta(days=item.interval_days)
+
+    if commit:
+        db.commit()
+
+
+def due_items(db: Session, student_id: int, until: datetime = None) -> list[RevisionItem]:
+    """Topics a student should revise by `until` (default: now), most overdue first."""
+    until = until or datetime.utcnow()
+    return (
+        db.query(RevisionItem)
+        .filter(RevisionItem.student_id == student_id, RevisionItem.due_at <= until)
+        .order_by(RevisionItem.due_at.asc())
+        .all()
+    )
+
+
+def students_with_overdue(db: Session, until: datetime = None) -> list[tuple[int, int, datetime]]:
+    """(student_id, overdue_count, oldest_due_at) for every student with overdue items."""
+    until = until or datetime.utcnow()
+    return (
+        db.query(
+            RevisionItem.student_id,
+            func.count(RevisionItem.id),
+            func.min(RevisionItem.due_at),
+        )
+        .filter(RevisionItem.due_at <= until)
+        .group_by(RevisionItem.student_id)
+        .order_by(RevisionItem.student_id)
+        .all()
+    )
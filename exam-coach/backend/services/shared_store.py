@@ -0,0 +1,205 @@
+"""
+Shared Store — cross-worker key/value cache, counters and leases on a local SQLite file.
+
+Every uvicorn worker opens the same file (WAL mode), so cache entries, data-version
+counters, rate-limit windows and "only one worker does this" leases agree across
+processes without an external service.  It is deliberately separate from the main
+database so cache traffic never contends for the app's write lock.
+
+Cached values and data versions describe one database, so the default store sits
+next to the SQLite file (`exam_coach.db` -> `exam_coach.store.db`); other backends
+get a file named after a hash of DATABASE_URL. SHARED_STORE_PATH overrides this.
+"""
+import os, json, time, hashlib, sqlite3, threading
+from sqlalchemy.engine import make_url
+from database import BASE_DIR, DATABASE_URL
+
+
+def _default_path(database_url: str) -> str:
+    url = make_url(database_url)
+    if url.get_backend_name() == "sqlite" and url.database and url.database != ":memory:":
+        return os.path.splitext(os.path.abspath(url.database))[0] + ".store.db"
+    digest = hashlib.sha1(database_url.encode("utf-8")).hexdigest()[:12]
+    return os.path.join(BASE_DIR, f"shared_store-{digest}.db")
+
+
+STORE_PATH = os.getenv("SHARED_STORE_PATH") or _default_path(DATABASE_URL)
+PURGE_INTERVAL_S = float(os.getenv("SHARED_STORE_PURGE_S", "60"))
+
+_local = threading.local()
+_last_purge = 0.0
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS kv (
+    key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL
+);
+CREATE TABLE IF NOT EXISTS counters (
+    key TEXT PRIMARY KEY, value INTEGER NOT NULL, expires_at REAL
+);
+CREATE TABLE IF NOT EXISTS leases (
+    name TEXT PRIMARY KEY, owner TEXT NOT NULL, expires_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_kv_expires ON kv (expires_at);
+CREATE INDEX IF NOT EXISTS ix_counters_expires ON counters (expires_at);
+"""
+
+
+def _conn() -> sqlite3.Connection:
+    """One connection per thread (and per process, since threads do not survive fork)."""
+    conn = getattr(_local, "conn", None)
+    if conn is None or getattr(_local, "pid", None) != os.getpid():
+        conn = sqlite3.connect(STORE_PATH, timeout=5, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(_SCHEMA)
+        _local.conn, _local.pid = conn, os.getpid()
+    return conn
+
+
+# ── Key/value cache ───────────────────────────────────────────────────────────
+def get(key: str, default=None):
+    row = _conn().execute(
+        "SELECT value FROM kv WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)",
+        (key, time.time()),
+    ).fetchone()
+    return json.loads(row[0]) if row else default
+
+
+def get_many(keys: list[str]) -> dict:
+    """Fetch several keys in one round-trip; missing/expired keys are omitted."""
+    if not keys:
+        return {}
+    rows = _conn().execute(
+        f"SELECT key, value FROM kv WHERE key IN ({','.join('?' * len(keys))}) "
+        "AND (expires_at IS NULL OR expires_at > ?)",
+        (*keys, time.time()),
+    ).fetchall()
+    return {k: json.loads(v) for k, v in rows}
+
+
+def get_prefix(prefix: str) -> dict:
+    """Every unexpired key starting with `prefix`."""
+    rows = _conn().execute(
+        "SELECT key, value FROM kv WHERE key >= ? AND key < ? AND (expires_at IS NULL OR expires_at > ?)",
+        (prefix, prefix + "\uffff", time.time()),
+    ).fetchall()
+    return {k: json.loads(v) for k, v in rows}
+
+
+def put(key: str, value, ttl: float = None):
+    _conn().execute(
+        "INSERT OR REPLACE INTO kv (key, value, expires_at) VALUES (?, ?, ?)",
+        (key, json.dumps(value), time.time() + ttl if ttl else None),
+    )
+    _maybe_purge()
+
+
+def put_many(items: dict, ttl: float = None):
+    expires = time.time() + ttl if ttl else None
+    _conn().executemany(
+        "INSERT OR REPLACE INTO kv (key, value, expires_at) VALUES (?, ?, ?)",
+        [(k, json.dumps(v), expires) for k, v in items.items()],
+    )
+    _maybe_purge()
+
+
+def drop_prefix(prefix: str) -> int:
+    return _conn().execute(
+        "DELETE FROM kv WHERE key >= ? AND key < ?", (prefix, prefix + "\uffff"),
+    ).rowcount
+
+
+def drop_if(key: str, value) -> bool:
+    """Delete `key` only while it still holds `value` (compare-and-delete)."""
+    return _conn().execute(
+        "DELETE FROM kv WHERE key = ? AND value = ?", (key, json.dumps(value)),
+    ).rowcount > 0
+
+
+# ── Counters ──────────────────────────────────────────────────────────────────
+def incr(key: str, amount: int = 1, ttl: float = None) -> int:
+    """
+    Atomically add `amount` and return the new value. `ttl` applies when the
+    counter is (re)created, which gives fixed-window semantics for rate limits.
+    """
+    now = time.time()
+    _maybe_purge()
+    return _conn().execute(
+        """
+        INSERT INTO counters (key, value, expires_at) VALUES (?, ?, ?)
+        ON CONFLICT(key) DO UPDATE SET
+            value      = CASE WHEN expires_at IS NOT NULL AND expires_at <= ? THEN excluded.value
+                              ELSE value + excluded.value END,
+            expires_at = CASE WHEN expires_at IS NOT NULL AND expires_at <= ? THEN excluded.expires_at
+                              ELSE expires_at END
+        RETURNING value
+        """,
+        (key, amount, now + ttl if ttl else None, now, now),
+    ).fetchone()[0]
+
+
+def counter(key: str) -> int:
+    row = _conn().execute(
+        "SELECT value FROM counters WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)",
+        (key, time.time()),
+    ).fetchone()
+    return row[0] if row else 0
+
+
+def allow(key: str, limit: int, window: float) -> bool:
+    """Fixed-window rate limit shared by all workers: at most `limit` hits per `window` seconds."""
+    return incr(f"rate:{key}", 1, ttl=window) <= limit
+
+
+# ── Data versions ─────────────────────────────────────────────────────────────
+def student_version(student_id: int) -> int:
+    """Bumped whenever a student's results change; part of every per-student cache key."""
+    return counter(f"student_version:{student_id}")
+
+
+def bump_student_version(student_id: int) -> int:
+    return incr(f"student_version:{student_id}")
+
+
+# ── Leases ────────────────────────────────────────────────────────────────────
+def acquire_lease(name: str, ttl: float, owner: str = None) -> bool:
+    """
+    Take (or renew) a named lease for `ttl` seconds. Returns False while another
+    owner holds an unexpired lease — used so periodic jobs run in one worker only.
+    """
+    owner = owner or str(os.getpid())
+    now = time.time()
+    row = _conn().execute(
+        """
+        INSERT INTO leases (name, owner, expires_at) VALUES (?, ?, ?)
+        ON CONFLICT(name) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at
+            WHERE leases.owner = excluded.owner OR leases.expires_at <= ?
+        RETURNING owner
+        """,
+        (name, owner, now + ttl, now),
+    ).fetchone()
+    return row is not None
+
+
+def _maybe_purge():
+    """
+    Writers purge expired rows at most once per PURGE_INTERVAL_S per process, so
+    versioned cache keys and rate-limit windows cannot pile up without a cleanup job.
+    """
+    global _last_purge
+    now = time.time()
+    if now - _last_purge >= PURGE_INTERVAL_S:
+        _last_purge = now
+        purge_expired()
+
+
+def release_lease(name: str, owner: str = None):
+    owner = owner or str(os.getpid())
+    _conn().execute("DELETE FROM leases WHERE name = ? AND owner = ?", (name, owner))
+
+
+def purge_expired() -> int:
+    now = time.time()
+    conn = _conn()
+    n = conn.execute("DELETE FROM kv WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,)).rowcount
+    n += conn.execute("DELETE FROM counters WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,)).rowcount
+    return n
@@ -0,0 +1,325 @@
+"""
+Static Assets — build-time minify / fingerprint / pre-compress, and a StaticFiles
+that serves the result.
+
+`build()` turns frontend/ into frontend/dist/:
+  * CSS and JS are minified and renamed to `name.<hash>.ext`;
+  * HTML pages keep their names (they are the entry points) but their
+    `href="style.css"` / `src="app.js"` references are rewritten to the hashed names;
+  * every text asset gets `.gz` (and `.br` when the `brotli` package is installed)
+    siblings, kept only when smaller than the original;
+  * manifest.json maps source names to hashed names.
+
+`PrecompressedStaticFiles` picks the best pre-compressed variant the client accepts
+and marks fingerprinted files `immutable` for a year; everything else is `no-cache`
+so HTML is revalidated (cheaply, via ETag) and always points at current hashes.
+"""
+import os, re, gzip, json, shutil, hashlib, mimetypes
+from pathlib import Path
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse
+from starlette.staticfiles import StaticFiles, NotModifiedResponse
+
+try:
+    import brotli
+except ImportError:  # optional: gzip-only builds without it
+    brotli = None
+
+DIST_NAME     = "dist"
+MANIFEST_NAME = "manifest.json"
+HASH_LENGTH   = 10
+COMPRESSIBLE  = {".html", ".css", ".js", ".json", ".svg", ".txt"}
+IMMUTABLE     = "public, max-age=31536000, immutable"
+REVALIDATE    = "no-cache"
+
+_HASHED_RE = re.compile(rf"\.[0-9a-f]{{{HASH_LENGTH}}}\.[A-Za-z0-9]+$")
+_WORD = re.compile(r"[A-Za-z0-9_$]")
+_REGEX_AFTER_WORDS = {"return", "typeof", "case", "do", "else", "in", "of", "void", "yield", "await", "delete"}
+
+
+# ── Minifiers ─────────────────────────────────────────────────────────────────
+def minify_css(src: str) -> str:
+    """Drop comments and collapse whitespace; string literals are left untouched."""
+    parts, code, i, n = [], [], 0, len(src)   # alternating code / string segments
+
+    def end_code():
+        css = "".join(code)
+        # Whitespace around these is never significant. ':' is excluded on the left
+        # because `a :hover` and `a:hover` are different selectors.
+        css = re.sub(r"\s*([{};,>])\s*", r"\1", css)
+        css = re.sub(r":\s+", ":", css)
+        parts.append(css.replace(";}", "}"))
+        code.clear()
+
+    while i < n:
+        c = src[i]
+        if c in "\"'":
+            j = i + 1
+            while j < n and src[j] != c:
+                j += 2 if src[j] == "\\" else 1
+            end_code()
+            parts.append(src[i:j + 1])
+            i = j + 1
+        elif src.startswith("/*", i):
+            end = src.find("*/", i + 2)
+            i = n if end < 0 else end + 2
+        elif c.isspace():
+            while i < n and src[i].isspace():
+                i += 1
+            code.append(" ")
+        else:
+            code.append(c)
+            i += 1
+    end_code()
+    return "".join(parts).strip()
+
+
+def minify_js(src: str) -> str:
+    """
+    Conservative JS minifier: strips comments, indentation and blank lines, and
+    collapses runs of spaces. Strings, template literals (including nested
+    `${...}` expressions) and regex literals are copied verbatim. Newlines are kept
+    wherever dropping them could change automatic semicolon insertion.
+    """
+    out: list[str] = []
+    stack = [0]          # brace depth per open `${`; one entry per nesting level
+    in_template = []     # parallel: True while reading template text at that level
+    i, n = 0, len(src)
+
+    def last() -> str:
+        return out[-1][-1] if out and out[-1] else ""
+
+    def regex_allowed() -> bool:
+        text = "".join(out[-8:]).rstrip()
+        if not text:
+            return True
+        if _WORD.match(text[-1]):
+            word = re.search(r"[A-Za-z_$][A-Za-z0-9_$]*$", text)
+            return bool(word) and word.group() in _REGEX_AFTER_WORDS
+        return text[-1] not in ")]}\"'`"
+
+    while i < n:
+        c = src[i]
+
+        if in_template and in_template[-1]:
+            # Inside template text: copy until the closing backtick or a `${`.
+            if c == "\\":
+                out.append(src[i:i + 2]); i += 2
+            elif c == "`":
+                out.append(c); i += 1
+                in_template.pop(); stack.pop()
+            elif src.startswith("${", i):
+                out.append("${"); i += 2
+                in_template[-1] = False
+            else:
+                out.append(c); i += 1
+            continue
+
+        if c in "\"'":
+            j = i + 1
+            while j < n and src[j] != c and src[j] != "\n":
+                j += 2 if src[j] == "\\" else 1
+            out.append(src[i:j + 1]); i = j + 1
+        elif c == "`":
+            out.append(c); i += 1
+            stack.append(0); in_template.append(True)
+        elif c.isspace() or src.startswith(("//", "/*"), i):
+            # A run of whitespace and comments is one separator: a newline if it
+            # contained one that ASI could depend on, a space if tokens would merge.
+            j, newline = i, False
+            while j < n:
+                if src[j].isspace():
+                    newline |= src[j] == "\n"
+                    j += 1
+                elif src.startswith("//", j):
+                    end = src.find("\n", j)
+                    j = n if end < 0 else end
+                elif src.startswith("/*", j):
+                    end = src.find("*/", j + 2)
+                    end = n if end < 0 else end + 2
+                    newline |= "\n" in src[j:end]
+                    j = end
+                else:
+                    break
+            prev, nxt = last(), src[j] if j < n else ""
+            i = j
+            if not prev or not nxt:
+                continue
+            if newline and prev not in "{;,([" and nxt not in "})],;.":
+                out.append("\n")
+            elif (_WORD.match(prev) and _WORD.match(nxt)) or (prev == nxt and prev in "+-/"):
+                out.append(" ")
+        elif c == "/" and regex_allowed():
+            j, in_class = i + 1, False
+            while j < n and (in_class or src[j] != "/") and src[j] != "\n":
+                if src[j] == "\\":
+                    j += 1
+                elif src[j] == "[":
+                    in_class = True
+                elif src[j] == "]":
+                    in_class = False
+                j += 1
+            out.append(src[i:j + 1]); i = j + 1
+        else:
+            if c == "{":
+                stack[-1] += 1
+            elif c == "}":
+                if stack[-1] == 0 and in_template:
+                    in_template[-1] = True   # closes a `${`, back to template text
+                else:
+                    stack[-1] -= 1
+            out.append(c); i += 1
+
+    return "".join(out).strip() + "\n"
+
+
+_MINIFIERS = {".css": minify_css, ".js": minify_js}
+
+
+# ── Build ─────────────────────────────────────────────────────────────────────
+def _fingerprint(name: str, data: bytes) -> str:
+    stem, ext = os.path.splitext(name)
+    return f"{stem}.{hashlib.sha256(data).hexdigest()[:HASH_LENGTH]}{ext}"
+
+
+def _rewrite_html(html: str, manifest: dict) -> str:
+    """Point src=/href= attributes that name a source asset at its hashed file."""
+    def repl(m):
+        return f'{m.group(1)}={m.group(2)}{manifest.get(m.group(3), m.group(3))}{m.group(2)}'
+    return re.sub(r'\b(src|href)=(["\'])([^"\'#?]+)\2', repl, html)
+
+
+def _write_variants(path: Path) -> dict:
+    """Write .gz/.br siblings that beat the original. Returns {encoding: size}."""
+    data = path.read_bytes()
+    sizes = {"identity": len(data)}
+    variants = {"gzip": (".gz", lambda d: gzip.compress(d, 9, mtime=0))}
+    if brotli is not None:
+        variants["br"] = (".br", lambda d: brotli.compress(d, quality=11))
+    for encoding, (suffix, compress) in variants.items():
+        packed = compress(data)
+        if len(packed) < len(data):
+            path.with_name(path.name + suffix).write_bytes(packed)
+            sizes[encoding] = len(packed)
+    return sizes
+
+
+def build(src_dir: Path, out_dir: Path = None) -> dict:
+    """
+    Build `src_dir` into `out_dir` (default src_dir/dist), replacing it entirely.
+    Returns the manifest: {"assets": {source: hashed}, "sizes": {file: {encoding: bytes}}}.
+    """
+    src_dir = Path(src_dir)
+    out_dir = Path(out_dir) if out_dir else src_dir / DIST_NAME
+    tmp_dir = out_dir.with_name(out_dir.name + ".tmp")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    tmp_dir.mkdir(parents=True)
+
+    sources = sorted(p for p in src_dir.iterdir() if p.is_file())
+    assets, pages = {}, []
+    for path in sources:
+        if path.suffix == ".html":
+            pages.append(path)
+            continue
+        data = path.read_bytes()
+        minify = _MINIFIERS.get(path.suffix)
+        if minify:
+            data = minify(data.decode("utf-8")).encode("utf-8")
+        hashed = _fingerprint(path.name, data)
+        (tmp_dir / hashed).write_bytes(data)
+        assets[path.name] = hashed
+
+    for path in pages:
+        html = _rewrite_html(path.read_text(encoding="utf-8"), assets)
+        (tmp_dir / path.name).write_text(html, encoding="utf-8")
+
+    sizes = {
+        p.name: _write_variants(p)
+        for p in sorted(tmp_dir.iterdir())
+        if p.suffix in COMPRESSIBLE
+    }
+    manifest = {"assets": assets, "sizes": sizes}
+    (tmp_dir / MANIFEST_NAME).write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+
+    # Swap in the finished build so a running server never sees a half-written dist/
+    old_dir = out_dir.with_name(out_dir.name + ".old")
+    shutil.rmtree(old_dir, ignore_errors=True)
+    if out_dir.exists():
+        out_dir.rename(old_dir)
+    tmp_dir.rename(out_dir)
+    shutil.rmtree(old_dir, ignore_errors=True)
+    return manifest
+
+
+def resolve_dir(src_dir: Path) -> Path:
+    """
+    The directory to serve: the build output if it exists and is newer than every
+    source file, otherwise the sources themselves (e.g. during `--reload` development).
+    """
+    src_dir = Path(src_dir)
+    manifest = src_dir / DIST_NAME / MANIFEST_NAME
+    if not manifest.exists():
+        return src_dir
+    newest_source = max((p.stat().st_mtime for p in src_dir.iterdir() if p.is_file()), default=0)
+    if newest_source > manifest.stat().st_mtime:
+        print(f"[WARN] {manifest.parent} is older than the sources; serving unbuilt assets "
+              f"(run `python build_assets.py` to rebuild)")
+        return src_dir
+    return manifest.parent
+
+
+# ── Serving ───────────────────────────────────────────────────────────────────
+class PrecompressedStaticFiles(StaticFiles):
+    """StaticFiles that negotiates `.br` / `.gz` siblings and sets Cache-Control."""
+
+    ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+    def file_response(self, full_path, stat_result, scope, status_code: int = 200):
+        request_headers = Headers(scope=scope)
+        full_path = str(full_path)
+        headers = {
+            "Cache-Control": IMMUTABLE if _HASHED_RE.search(full_path) else REVALIDATE,
+        }
+        media_type = mimetypes.guess_type(full_path)[0] or "text/plain"
+
+        served_path, served_stat = full_path, stat_result
+        if os.path.splitext(full_path)[1] in COMPRESSIBLE:
+            headers["Vary"] = "Accept-Encoding"
+            accepted = _accepted_encodings(request_headers.get("accept-encoding", ""))
+            for encoding, suffix in self.ENCODINGS:
+                if encoding not in accepted:
+                    continue
+                try:
+                    served_stat = os.stat(full_path + suffix)
+                except OSError:
+                    continue
+                served_path = full_path + suffix
+                headers["Content-Encoding"] = encoding
+                break
+
+        response = FileResponse(
+            served_path, status_code=status_code, stat_result=served_stat,
+            method=scope["method"], media_type=media_type, headers=headers,
+        )
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
+
+
+def _accepted_encodings(header: str) -> set[str]:
+    """Codings from an Accept-Encoding header, minus any explicitly refused with q=0."""
+    accepted = set()
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        q = params.strip()
+        if q.startswith("q="):
+            try:
+                if float(q[2:]) == 0:
+                    continue
+            except ValueError:
+                continue
+        if coding:
+            accepted.add(coding.strip().lower())
+    if "*" in accepted:
+        accepted |= {"br", "gzip"}
+    return accepted
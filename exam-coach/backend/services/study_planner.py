@@ -0,0 +1,141 @@
+"""
+Study Plan Optimiser — deterministic allocation of study hours across weak topics.
+
+Hours are handed out in fixed-size slots under a daily budget, weighted by weakness
+score, and each topic is re-visited on a spaced-repetition schedule (1, 2, 4, 7 … days
+after its previous session).  No LLM round-trip is needed to build the schedule itself.
+"""
+import os, math
+
+DEFAULT_DAYS        = int(os.getenv("PLAN_DAYS", "7"))
+DEFAULT_DAILY_HOURS = float(os.getenv("PLAN_DAILY_HOURS", "3"))
+
+SLOT_HOURS     = 0.5                 # smallest schedulable unit
+MAX_TOPICS     = 8                   # same cut-off the LLM prompt used
+MIN_WEIGHT     = 0.05                # keeps strong topics from starving entirely
+REVIEW_GAPS    = [1, 2, 4, 7, 14]    # days between successive sessions of a topic
+QUESTIONS_PER_HOUR = 8               # base rate, scaled up by weakness
+
+_FALLBACK_TOPIC = {"topic": "General Revision", "subject": "All", "weakness_score": 0.5}
+
+
+def allocate_slots(weights: list[float], total_slots: int) -> list[int]:
+    """
+    Split `total_slots` proportionally to `weights` (largest-remainder method).
+    Every topic receives at least one slot whenever there are enough to go round.
+    """
+    n = len(weights)
+    if n == 0 or total_slots <= 0:
+        return [0] * n
+
+    guaranteed = 1 if total_slots >= n else 0
+    remaining = total_slots - guaranteed * n
+    total_w = sum(weights) or 1.0
+    quotas = [remaining * w / total_w for w in weights]
+    slots = [guaranteed + int(q) for q in quotas]
+
+    leftover = total_slots - sum(slots)
+    by_remainder = sorted(range(n), key=lambda i: (-(quotas[i] - int(quotas[i])), -weights[i], i))
+    for i in by_remainder[:leftover]:
+        slots[i] += 1
+    return slots
+
+
+def _schedule(slots: list[int], weights: list[float], days: int, daily_slots: int) -> list[list[tuple[int, int]]]:
+    """
+    Greedy day-by-day placement of each topic's slots.
+
+    A topic is eligible on a day once its spaced-repetition gap has elapsed; among
+    eligible topics the one with the most unplaced slots goes first.  A single topic
+    may take at most half the day unless nothing else is left, and spacing is relaxed
+    only when eligible topics cannot fill the day.
+    Returns, per day, a list of (topic_index, slot_count).
+    """
+    n = len(slots)
+    remaining = list(slots)
+    next_day = [0] * n
+    sessions = [0] * n
+    per_topic_cap = max(1, math.ceil(daily_slots / 2))
+    schedule = []
+
+    for day in range(days):
+        free = daily_slots
+        placed: dict[int, int] = {}
+
+        def fill(candidates, cap):
+            nonlocal free
+            for i in sorted(candidates, key=lambda i: (-remaining[i], -weights[i], i)):
+                if free == 0:
+                    break
+                take = min(remaining[i], cap - placed.get(i, 0), free)
+                if take <= 0:
+                    continue
+                placed[i] = placed.get(i, 0) + take
+                remaining[i] -= take
+                free -= take
+
+        fill([i for i in range(n) if remaining[i] and next_day[i] <= day], per_topic_cap)
+        if free:
+            fill([i for i in range(n) if remaining[i]], per_topic_cap)
+        if free:
+            fill([i for i in range(n) if remaining[i]], daily_slots)
+
+        for i in placed:
+            gap = REVIEW_GAPS[min(sessions[i], len(REVIEW_GAPS) - 1)]
+            sessions[i] += 1
+            next_day[i] = day + gap
+        schedule.append(sorted(placed.items(), key=lambda p: (-p[1], p[0])))
+
+    return schedule
+
+
+def build_study_plan(weak_topics: list[dict], days: int = DEFAULT_DAYS,
+                     daily_hours: float = DEFAULT_DAILY_HOURS) -> dict:
+    """
+    Return a plan dict shaped like the LLM output ({"days": [...]}) with an extra
+    per-day "sessions" breakdown.  `tip` is left empty for the caller to fill in.
+    Every day has at least one session: the allocator hands out exactly
+    days * daily_slots slots and the scheduler fills each day's budget.
+    """
+    topics = weak_topics[:MAX_TOPICS] if weak_topics else [_FALLBACK_TOPIC]
+    weights = [max(t.get("weakness_score", 0.5), MIN_WEIGHT) for t in topics]
+    daily_slots = max(1, int(round(daily_hours / SLOT_HOURS)))
+
+    slots = allocate_slots(weights, days * daily_slots)
+    schedule = _schedule(slots, weights, days, daily_slots)
+    seen = set()
+
+    plan_days = []
+    for d, placed in enumerate(schedule):
+        sessions = []
+        for i, n_slots in placed:
+            t = topics[i]
+            hours = n_slots * SLOT_HOURS
+            kind = "review" if i in seen else "learn"
+            seen.add(i)
+            sessions.append({
+                "topic": t["topic"],
+                "subject": t["subject"],
+                "hours": hours,
+                "kind": kind,
+                "practice_questions": int(hours * QUESTIONS_PER_HOUR * (1 + weights[i])),
+            })
+
+        focus = sessions[0]
+        blocks = [
+            f"{'Concept review' if s['kind'] == 'learn' else 'Spaced revision'}: "
+            f"{s['topic']} ({s['hours']:g}h)"
+            for s in sessions
+        ]
+        blocks += ["Timed mini-test (10 questions)", "Review mistakes & notes"]
+        plan_days.append({
+            "day": d + 1,
+            "date_label": f"Day {d+1}",
+            "focus": focus["topic"],
+            "duration_hours": sum(s["hours"] for s in sessions),
+            "practice_questions": sum(s["practice_questions"] for s in sessions),
+            "revision_blocks": blocks,
+            "sessions": sessions,
+            "tip": "",
+        })
+    return {"days": plan_days}
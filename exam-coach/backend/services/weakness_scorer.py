@@ -3,49 +3,91 @@ Weakness Scoring Service
 Formula: Weakness Score = (Error Rate × 0.6) + (Norm Avg Time × 0.2) + (Mistake Freq × 0.2)
 """
 from sqlalchemy.orm import Session
-from database import QuestionResult, TopicScore
+from database import QuestionResult, TopicScore, TopicRollup
 from datetime import datetime
 from collections import defaultdict
 
 
-def compute_and_store_scores(db: Session, student_id: int, mock_test_id: int):
+def compute_scores(db: Session, student_id: int) -> list[dict]:
     """
-    Reads all QuestionResults for this student, computes per-topic weakness scores,
-    and upserts them into TopicScore.
+    Reads all QuestionResults (and archived roll-ups) for this student and computes
+    per-topic weakness scores. Read-only; see store_scores for the write half.
     """
     # Fetch ALL results for the student (across all tests for cumulative accuracy)
     all_results = (
-        db.query(QuestionResult)
+        db.query(QuestionResult.subject, QuestionResult.topic,
+                 QuestionResult.is_correct, QuestionResult.time_taken)
         .join(QuestionResult.mock_test)
         .filter_by(student_id=student_id)
         .all()
     )
 
+    # Results archived by the retention job live on as per-topic rollups
+    rollups = db.query(TopicRollup).filter_by(student_id=student_id).all()
+
+    return score_topics(all_results, rollups)
+
+
+def store_scores(db: Session, student_id: int, raw_scores: list[dict]):
+    """Write half of a rescore: upsert `raw_scores` into TopicScore (caller commits)."""
+    if not raw_scores:
+        return
+
+    existing = {
+        (ts.subject, ts.topic): ts
+        for ts in db.query(TopicScore).filter_by(student_id=student_id).all()
+    }
+    now = datetime.utcnow()
+    for s in raw_scores:
+        row = existing.get((s["subject"], s["topic"]))
+        if row:
+            row.error_rate = s["error_rate"]
+            row.avg_time = s["avg_time"]
+            row.mistake_freq = s["mistake_freq"]
+            row.weakness_score = s["weakness_score"]
+            row.updated_at = now
+        else:
+            db.add(TopicScore(student_id=student_id, **s))
+
+
+def score_topics(results, rollups=()) -> list[dict]:
+    """
+    Per-topic metrics and weakness score for one student's question results.
+    `results` is any iterable of objects with subject, topic, is_correct and time_taken;
+    `rollups` are pre-aggregated TopicRollup-like rows (total, correct, time_sum, time_max).
+    """
     # Aggregate per topic
-    topic_data = defaultdict(lambda: {"subject": "", "correct": 0, "total": 0, "times": [], "wrongs": 0})
+    topic_data = defaultdict(lambda: {"correct": 0, "total": 0, "time_sum": 0.0, "time_max": 0.0, "wrongs": 0})
 
-    for r in all_results:
-        key = (r.subject, r.topic)
-        topic_data[key]["subject"] = r.subject
-        topic_data[key]["total"] += 1
+    for r in results:
+        d = topic_data[(r.subject, r.topic)]
+        d["total"] += 1
         if r.is_correct:
-            topic_data[key]["correct"] += 1
+            d["correct"] += 1
         else:
-            topic_data[key]["wrongs"] += 1
-        topic_data[key]["times"].append(r.time_taken)
+            d["wrongs"] += 1
+        d["time_sum"] += r.time_taken
+        d["time_max"] = max(d["time_max"], r.time_taken)
+
+    for r in rollups:
+        d = topic_data[(r.subject, r.topic)]
+        d["total"] += r.total
+        d["correct"] += r.correct
+        d["wrongs"] += r.total - r.correct
+        d["time_sum"] += r.time_sum
+        d["time_max"] = max(d["time_max"], r.time_max)
 
     if not topic_data:
-        return
+        return []
 
     # Compute raw metrics
     raw_scores = []
-    all_times = [t for d in topic_data.values() for t in d["times"]]
-    max_time = max(all_times) if all_times else 1
+    max_time = max(d["time_max"] for d in topic_data.values()) or 1
     max_mistakes = max(d["wrongs"] for d in topic_data.values()) or 1
 
     for (subject, topic), d in topic_data.items():
         error_rate = 1 - (d["correct"] / d["total"]) if d["total"] else 0
-        avg_time = sum(d["times"]) / len(d["times"]) if d["times"] else 0
+        avg_time = d["time_sum"] / d["total"] if d["total"] else 0
         mistake_freq = d["wrongs"]
 
         # Normalise avg_time and mistake_freq to [0, 1]
@@ -63,20 +105,4 @@ def compute_and_store_scores(db: Session, student_id: int, mock_test_id: int):
             "weakness_score": round(weakness_score, 4),
         })
 
-    # Upsert into DB
-    for s in raw_scores:
-        existing = (
-            db.query(TopicScore)
-            .filter_by(student_id=student_id, subject=s["subject"], topic=s["topic"])
-            .first()
-        )
-        if existing:
-            existing.error_rate = s["error_rate"]
-            existing.avg_time = s["avg_time"]
-            existing.mistake_freq = s["mistake_freq"]
-            existing.weakness_score = s["weakness_score"]
-            existing.updated_at = datetime.utcnow()
-        else:
-            db.add(TopicScore(student_id=student_id, **s))
-
-    db.commit()
+    return raw_scores
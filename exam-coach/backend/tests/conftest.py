@@ -0,0 +1,4 @@
+import os, sys
+
+# Backend modules are imported top-level (`from services import ...`), as under uvicorn
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
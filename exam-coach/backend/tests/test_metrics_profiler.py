@@ -0,0 +1,95 @@
+"""The sampling profiler credits each request only with stacks from its own endpoint thread."""
+import asyncio, time
+import httpx
+from fastapi import APIRouter, Depends, FastAPI
+from services import metrics
+from services.metrics import ProfiledRoute, metrics_middleware
+
+
+def _dependency():
+    # Sync dependencies run in their own threadpool call, usually on another thread
+    time.sleep(0.01)
+
+
+def _work_alpha():
+    end = time.perf_counter() + 0.3
+    while time.perf_counter() < end:
+        time.sleep(0.001)
+
+
+def _work_beta():
+    end = time.perf_counter() + 0.3
+    while time.perf_counter() < end:
+        time.sleep(0.001)
+
+
+def _app() -> FastAPI:
+    router = APIRouter(route_class=ProfiledRoute, dependencies=[Depends(_dependency)])
+
+    @router.get("/alpha")
+    def alpha():
+        _work_alpha()
+        return {"ok": True}
+
+    @router.get("/beta")
+    def beta():
+        _work_beta()
+        return {"ok": True}
+
+    app = FastAPI()
+    app.middleware("http")(metrics_middleware)
+    app.include_router(router)
+    return app
+
+
+def _folded(path) -> str:
+    return path.read_text(encoding="utf-8")
+
+
+def test_concurrent_slow_requests_get_only_their_own_frames(tmp_path, monkeypatch):
+    monkeypatch.setattr(metrics, "_sampler", metrics._Sampler())
+    monkeypatch.setattr(metrics, "PROFILE_SLOW_MS", 0)
+    monkeypatch.setattr(metrics, "PROFILE_DIR", str(tmp_path))
+    monkeypatch.setattr(metrics, "_route_paths", {})
+    app = _app()
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            responses = await asyncio.gather(*[
+                client.get(path) for _ in range(4) for path in ("/alpha", "/beta")
+            ])
+        assert all(r.status_code == 200 for r in responses)
+
+    asyncio.run(run())
+
+    alpha = sorted(tmp_path.glob("*_alpha_*.folded"))
+    beta = sorted(tmp_path.glob("*_beta_*.folded"))
+    assert len(alpha) == 4 and len(beta) == 4
+    for path in alpha:
+        assert "_work_alpha" in _folded(path)
+        assert "_work_beta" not in _folded(path)
+    for path in beta:
+        assert "_work_beta" in _folded(path)
+        assert "_work_alpha" not in _folded(path)
+
+
+def test_included_routes_are_wrapped_once():
+    app = _app()
+    alpha = next(r for r in app.routes if getattr(r, "path", "") == "/alpha")
+    assert not hasattr(alpha.endpoint.__wrapped__, "__wrapped__")
+
+
+def test_endpoint_thread_is_released_after_the_call(monkeypatch):
+    sampler = metrics._Sampler()
+    monkeypatch.setattr(metrics, "_sampler", sampler)
+    monkeypatch.setattr(metrics, "_route_paths", {})
+    app = _app()
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            await client.get("/alpha")
+
+    asyncio.run(run())
+    assert sampler._owner == {}
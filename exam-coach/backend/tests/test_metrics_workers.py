@@ -0,0 +1,50 @@
+"""/metrics sums the snapshots every worker publishes to the shared store."""
+import threading
+from collections import defaultdict
+import pytest
+from services import metrics, shared_store
+
+
+@pytest.fixture
+def fresh(tmp_path, monkeypatch):
+    monkeypatch.setattr(shared_store, "STORE_PATH", str(tmp_path / "store.db"))
+    monkeypatch.setattr(shared_store, "_local", threading.local())
+    monkeypatch.setattr(metrics, "_counters", defaultdict(lambda: defaultdict(float)))
+    monkeypatch.setattr(metrics, "_histograms", defaultdict(dict))
+
+
+def _other_worker(pid: int):
+    """Record into a private table set and publish it as process `pid` would."""
+    counters, histograms = defaultdict(lambda: defaultdict(float)), defaultdict(dict)
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(metrics, "_counters", counters)
+        mp.setattr(metrics, "_histograms", histograms)
+        mp.setattr(metrics, "_SNAPSHOT_KEY", f"metrics:{pid}:0")
+        metrics.inc("llm_fallback_total", {"kind": "plan_tip"}, 2)
+        metrics.observe("db_queries_per_request", {"method": "GET", "route": "/x"}, 3)
+        metrics.publish()
+
+
+def test_render_sums_every_worker(fresh):
+    metrics.inc("llm_fallback_total", {"kind": "plan_tip"})
+    metrics.observe("db_queries_per_request", {"method": "GET", "route": "/x"}, 30)
+    _other_worker(4242)
+
+    text = metrics.render()
+    assert 'llm_fallback_total{kind="plan_tip"} 3' in text
+    assert 'db_queries_per_request_count{method="GET",route="/x"} 2' in text
+    assert 'db_queries_per_request_bucket{method="GET",route="/x",le="5"} 1' in text
+    assert 'db_queries_per_request_bucket{method="GET",route="/x",le="50"} 2' in text
+    assert 'db_queries_per_request_sum{method="GET",route="/x"} 33.000000' in text
+
+
+def test_render_is_stable_across_scrapes(fresh):
+    metrics.inc("llm_fallback_total", {"kind": "plan_tip"})
+    _other_worker(4242)
+    assert metrics.render() == metrics.render()
+
+
+def test_reset_shared_forgets_previous_runs(fresh):
+    _other_worker(4242)
+    metrics.reset_shared()
+    assert 'llm_fallback_total{kind="plan_tip"}' not in metrics.render()
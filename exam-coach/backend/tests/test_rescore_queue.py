@@ -0,0 +1,96 @@
+"""Pending-rescore bookkeeping of the debounced rescore queue, across workers."""
+import threading
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from database import Base
+from services import rescore_queue, shared_store
+
+
+@pytest.fixture
+def queue(tmp_path, monkeypatch):
+    """
+    A quiet queue on a private database and shared store: no background thread,
+    and the list of student ids each rescore computed.
+    """
+    engine = create_engine(f"sqlite:///{tmp_path / 'db.sqlite'}")
+    Base.metadata.create_all(engine)
+    monkeypatch.setattr(rescore_queue, "SessionLocal", sessionmaker(bind=engine))
+    monkeypatch.setattr(shared_store, "STORE_PATH", str(tmp_path / "store.db"))
+    monkeypatch.setattr(shared_store, "_local", threading.local())
+
+    monkeypatch.setattr(rescore_queue, "_pending", {})
+    monkeypatch.setattr(rescore_queue, "_recent", {})
+    monkeypatch.setattr(rescore_queue, "_in_flight", set())
+    monkeypatch.setattr(rescore_queue, "_ensure_thread", lambda: None)
+
+    computed = []
+    compute = rescore_queue.compute_scores
+
+    def recording_compute(db, sid):
+        computed.append(sid)
+        return compute(db, sid)
+
+    monkeypatch.setattr(rescore_queue, "compute_scores", recording_compute)
+    yield computed
+    engine.dispose()
+
+
+def _marked(sid: int) -> bool:
+    return shared_store.get(rescore_queue._marker(sid)) is not None
+
+
+def test_burst_submit_is_marked_in_the_shared_store(queue):
+    assert rescore_queue.schedule(7) is True      # leading edge: inline
+    assert not _marked(7)
+    assert rescore_queue.schedule(7) is False     # inside the window: coalesced
+    assert _marked(7)
+    assert queue == [7]
+
+
+def test_flush_on_another_worker_rescores_a_marked_student(queue):
+    rescore_queue.schedule(7)
+    rescore_queue.schedule(7)
+    rescore_queue._pending.clear()                # this process is now "another worker"
+    rescore_queue.flush(7)
+    assert queue == [7, 7]
+    assert not _marked(7)
+    rescore_queue.flush(7)                        # nothing pending any more
+    assert queue == [7, 7]
+
+
+def test_flush_without_a_marker_does_nothing(queue):
+    rescore_queue.flush(7)
+    assert queue == []
+
+
+def test_submit_during_a_rescore_stays_pending(queue, monkeypatch):
+    shared_store.put(rescore_queue._marker(7), 1)
+    compute = rescore_queue.compute_scores
+
+    def submit_midway(db, sid):
+        shared_store.put(rescore_queue._marker(sid), 2)   # another worker's submit
+        return compute(db, sid)
+
+    monkeypatch.setattr(rescore_queue, "compute_scores", submit_midway)
+    rescore_queue.flush(7)
+    assert shared_store.get(rescore_queue._marker(7)) == 2
+
+
+def test_batch_skips_students_another_worker_already_rescored(queue):
+    shared_store.put(rescore_queue._marker(1), 1)
+    rescore_queue.rescore_now([1, 2], only_marked=True)
+    assert queue == [1]
+
+
+def test_failed_flush_leaves_the_student_pending(queue, monkeypatch):
+    def boom(db, sid):
+        raise RuntimeError("database is locked")
+
+    monkeypatch.setattr(rescore_queue, "compute_scores", boom)
+    shared_store.put(rescore_queue._marker(7), 1)
+    rescore_queue._pending[7] = (1.0, 2.0)
+    with pytest.raises(RuntimeError):
+        rescore_queue.flush(7)
+    assert rescore_queue._pending == {7: (1.0, 2.0)}
+    assert _marked(7)
@@ -0,0 +1,134 @@
+"""Retention: archiving into roll-ups keeps every number readers see, one pass at a time."""
+import random, threading
+from datetime import datetime, timedelta
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from database import Base, MockTest, QuestionResult, TopicRollup, TestSummary as Summary
+from routers import retention as retention_router
+from routers.progress import get_progress
+from services import retention, shared_store
+from services.weakness_scorer import compute_scores, score_topics
+
+TOPICS = [("Physics", "Optics"), ("Physics", "Electrostatics"), ("Mathematics", "Calculus"),
+          ("Mathematics", "Algebra"), ("Chemistry", "Thermodynamics")]
+STUDENTS = (1, 2)
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    """A session on a private database, which the retention service also uses."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'db.sqlite'}")
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    monkeypatch.setattr(retention, "SessionLocal", Session)
+    monkeypatch.setattr(retention, "engine", engine)
+    monkeypatch.setattr(shared_store, "STORE_PATH", str(tmp_path / "store.db"))
+    monkeypatch.setattr(shared_store, "_local", threading.local())
+    session = Session()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+# ── One pass at a time ────────────────────────────────────────────────────────
+def test_pass_is_refused_while_another_worker_runs_one(db):
+    assert shared_store.acquire_lease("retention:pass", 60, owner="another-worker")
+    assert retention.run_retention(vacuum=False) is None
+    assert retention.last_report() == {}
+
+
+def test_pass_releases_its_lease(db):
+    assert retention.run_retention(vacuum=False) is not None
+    assert retention.run_retention(vacuum=False) is not None
+    assert retention.last_report()["tests_archived"] == 0
+
+
+def test_manual_run_returns_409_while_a_pass_runs(db, monkeypatch):
+    monkeypatch.setattr(retention_router, "ADMIN_TOKEN", "secret")
+    assert shared_store.acquire_lease("retention:pass", 60, owner="background")
+    with pytest.raises(HTTPException) as exc:
+        retention_router.run_retention_now(vacuum=False, x_admin_token="secret")
+    assert exc.value.status_code == 409
+
+
+# ── Roll-up equivalence ───────────────────────────────────────────────────────
+def _seed(db, seed: int = 3):
+    """Twelve tests per student spread over 200 days, with fractional answer times."""
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    for sid in STUDENTS:
+        for days_ago in sorted(rng.sample(range(1, 200), 12), reverse=True):
+            test = MockTest(student_id=sid, submitted_at=now - timedelta(days=days_ago), raw_json="{}")
+            db.add(test)
+            db.flush()
+            for q in range(20):
+                subject, topic = rng.choice(TOPICS)
+                db.add(QuestionResult(
+                    mock_test_id=test.id, subject=subject, topic=topic, question_id=f"q{q}",
+                    student_answer="A", correct_answer=rng.choice("AB"),
+                    time_taken=round(rng.uniform(5, 180), 2),
+                ))
+    db.commit()
+
+
+def _all_results(db, sid: int):
+    return (
+        db.query(QuestionResult.subject, QuestionResult.topic,
+                 QuestionResult.is_correct, QuestionResult.time_taken)
+        .join(QuestionResult.mock_test)
+        .filter(MockTest.student_id == sid)
+        .all()
+    )
+
+
+def _archive_everything_old(db) -> int:
+    cutoff = datetime.utcnow() - timedelta(days=retention.RAW_DAYS)
+    archived = 0
+    while True:
+        n_tests, _ = retention.archive_tests(db, cutoff, limit=5)   # several batches per rollup
+        if not n_tests:
+            return archived
+        archived += n_tests
+
+
+def _by_topic(scores: list[dict]) -> dict:
+    return {(s["subject"], s["topic"]): s for s in scores}
+
+
+def test_archiving_keeps_weakness_scores(db):
+    _seed(db)
+    before = {sid: _by_topic(score_topics(_all_results(db, sid))) for sid in STUDENTS}
+
+    assert _archive_everything_old(db) > 0
+    assert db.query(TopicRollup).count() > 0
+
+    for sid in STUDENTS:
+        live = _all_results(db, sid)
+        assert 0 < len(live) < 12 * 20, "some tests archived, some still live"
+        after = _by_topic(compute_scores(db, sid))
+        assert after.keys() == before[sid].keys()
+        for key, b in before[sid].items():
+            a = after[key]
+            assert a["mistake_freq"] == b["mistake_freq"]
+            assert a["error_rate"] == b["error_rate"]
+            # Sums are added in a different order, so a 2-dp rounding can land one step apart
+            assert a["avg_time"] == pytest.approx(b["avg_time"], abs=0.011)
+            assert a["weakness_score"] == pytest.approx(b["weakness_score"], abs=2e-4)
+
+
+def test_archiving_keeps_progress_totals(db):
+    _seed(db)
+    before = {sid: get_progress(sid, db=db).history for sid in STUDENTS}
+
+    _archive_everything_old(db)
+    assert db.query(Summary).count() > 0
+
+    for sid in STUDENTS:
+        after = get_progress(sid, db=db).history
+        assert len(after) == len(before[sid]) == 12
+        for a, b in zip(after, before[sid]):
+            assert (a.test_number, a.total_questions, a.accuracy) == (b.test_number, b.total_questions, b.accuracy)
+            assert a.avg_time == pytest.approx(b.avg_time, abs=0.11)
+        assert sum(p.total_questions for p in after) == 12 * 20
@@ -0,0 +1,120 @@
+"""SM-2 steps and the per-test schedule update of the revision scheduler."""
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from database import Base, Student, MockTest, QuestionResult, RevisionItem
+from services.revision_scheduler import (
+    sm2_step, update_from_test, MAX_INTERVAL_DAYS, MIN_EASINESS,
+)
+
+T0 = datetime(2026, 1, 5, 9, 0)
+
+
+# ── sm2_step ──────────────────────────────────────────────────────────────────
+def test_passes_grow_the_interval():
+    e, interval, reps = sm2_step(2.5, 0, 0, 5)
+    assert (interval, reps) == (1, 1)
+    e, interval, reps = sm2_step(e, interval, reps, 5)
+    assert (interval, reps) == (6, 2)
+    e3, interval, reps = sm2_step(e, interval, reps, 4)
+    assert (interval, reps) == (round(6 * e), 3)
+    assert e3 == pytest.approx(e)   # grade 4 leaves easiness unchanged
+
+
+def test_fail_resets_repetitions_and_interval():
+    e, interval, reps = sm2_step(2.5, 40, 5, 2)
+    assert (interval, reps) == (1, 0)
+    assert e < 2.5
+
+
+def test_interval_is_capped():
+    _, interval, _ = sm2_step(2.5, 300, 8, 5)
+    assert interval == MAX_INTERVAL_DAYS
+    _, interval, _ = sm2_step(2.5, MAX_INTERVAL_DAYS, 9, 5)
+    assert interval == MAX_INTERVAL_DAYS
+
+
+def test_easiness_has_a_floor():
+    e, _, _ = sm2_step(MIN_EASINESS, 1, 0, 0)
+    assert e == MIN_EASINESS
+
+
+# ── update_from_test ──────────────────────────────────────────────────────────
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False},
+                           poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    session.add(Student(id=1, email="s@example.com", password_hash="x"))
+    session.commit()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def _submit(db, grades: dict[str, tuple[int, int]], at: datetime) -> int:
+    """Add a test on subject "Maths" with (correct, total) answers per topic; returns its id."""
+    test = MockTest(student_id=1, submitted_at=at)
+    db.add(test)
+    db.flush()
+    for topic, (correct, total) in grades.items():
+        for i in range(total):
+            db.add(QuestionResult(mock_test_id=test.id, subject="Maths", topic=topic,
+                                  question_id=f"{topic}-{i}", time_taken=30.0,
+                                  is_correct=i < correct))
+    db.commit()
+    return test.id
+
+
+def _item(db, topic: str) -> RevisionItem:
+    db.expire_all()
+    return db.query(RevisionItem).filter_by(student_id=1, topic=topic).one()
+
+
+def test_first_test_creates_one_item_per_topic(db):
+    update_from_test(db, 1, _submit(db, {"Algebra": (5, 5), "Geometry": (1, 5)}, T0), now=T0)
+    algebra, geometry = _item(db, "Algebra"), _item(db, "Geometry")
+    assert (algebra.repetitions, algebra.interval_days, algebra.last_quality) == (1, 1, 5)
+    assert algebra.due_at == T0 + timedelta(days=1)
+    assert (geometry.repetitions, geometry.interval_days, geometry.last_quality) == (0, 1, 1)
+
+
+def test_existing_items_are_updated_not_duplicated(db):
+    update_from_test(db, 1, _submit(db, {"Algebra": (5, 5)}, T0), now=T0)
+    later = T0 + timedelta(days=1)
+    update_from_test(db, 1, _submit(db, {"Algebra": (5, 5), "Calculus": (4, 5)}, later), now=later)
+    assert db.query(RevisionItem).filter_by(student_id=1).count() == 2
+    algebra = _item(db, "Algebra")
+    assert (algebra.repetitions, algebra.interval_days) == (2, 6)
+    assert algebra.due_at == later + timedelta(days=6)
+
+
+def test_early_pass_keeps_the_schedule(db):
+    update_from_test(db, 1, _submit(db, {"Algebra": (5, 5)}, T0), now=T0)
+    before = _item(db, "Algebra")
+    due, easiness = before.due_at, before.easiness
+    early = T0 + timedelta(hours=6)
+    update_from_test(db, 1, _submit(db, {"Algebra": (4, 5)}, early), now=early)
+    after = _item(db, "Algebra")
+    assert (after.repetitions, after.interval_days, after.due_at) == (1, 1, due)
+    assert after.easiness == easiness
+    assert after.last_quality == 4 and after.last_practiced_at == early
+
+
+def test_early_fail_resets_the_item(db):
+    update_from_test(db, 1, _submit(db, {"Algebra": (5, 5)}, T0), now=T0)
+    later = T0 + timedelta(days=1)
+    update_from_test(db, 1, _submit(db, {"Algebra": (5, 5)}, later), now=later)
+    early = later + timedelta(days=2)   # due after 6 days
+    update_from_test(db, 1, _submit(db, {"Algebra": (1, 5)}, early), now=early)
+    algebra = _item(db, "Algebra")
+    assert (algebra.repetitions, algebra.interval_days) == (0, 1)
+    assert algebra.due_at == early + timedelta(days=1)
+
+
+def test_test_without_results_is_a_no_op(db):
+    update_from_test(db, 1, _submit(db, {}, T0), now=T0)
+    assert db.query(RevisionItem).count() == 0
@@ -0,0 +1,44 @@
+"""Expiry and compare-and-delete in the cross-worker shared store."""
+import time, threading
+import pytest
+from services import shared_store
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(shared_store, "STORE_PATH", str(tmp_path / "store.db"))
+    monkeypatch.setattr(shared_store, "_local", threading.local())
+    monkeypatch.setattr(shared_store, "_last_purge", 0.0)
+    return shared_store
+
+
+def _rows(table: str) -> int:
+    return shared_store._conn().execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+def test_writes_purge_expired_rows(store, monkeypatch):
+    monkeypatch.setattr(store, "PURGE_INTERVAL_S", 0)
+    store.put("analysis:1:1", {"a": 1}, ttl=0.01)
+    store.allow("llm:1", limit=5, window=0.01)
+    store.put("tip:x", "kept")
+    time.sleep(0.02)
+    store.put("analysis:1:2", {"a": 2}, ttl=60)
+    assert _rows("kv") == 2 and store.get("analysis:1:1") is None
+    assert _rows("counters") == 0
+
+
+def test_purge_runs_at_most_once_per_interval(store, monkeypatch):
+    monkeypatch.setattr(store, "PURGE_INTERVAL_S", 3600)
+    store.put("a", 1, ttl=0.01)           # first write purges (nothing yet)
+    time.sleep(0.02)
+    store.put("b", 2)
+    assert _rows("kv") == 2               # expired "a" waits for the next interval
+    assert store.purge_expired() == 1
+
+
+def test_drop_if_only_deletes_the_expected_value(store):
+    store.put("rescore_pending:7", 3)
+    assert not store.drop_if("rescore_pending:7", 2)
+    assert store.get("rescore_pending:7") == 3
+    assert store.drop_if("rescore_pending:7", 3)
+    assert store.get("rescore_pending:7") is None
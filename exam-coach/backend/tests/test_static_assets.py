@@ -0,0 +1,117 @@
+"""Edge cases of the build-time CSS / JS minifiers, and their output on the real frontend."""
+import re, shutil, subprocess
+from pathlib import Path
+import pytest
+from services.static_assets import minify_css, minify_js
+
+FRONTEND = Path(__file__).resolve().parents[2] / "frontend"
+
+
+def _squash(text: str) -> str:
+    return re.sub(r"\s+", "", text)
+
+
+# ── minify_js: regex vs division ──────────────────────────────────────────────
+@pytest.mark.parametrize("src,expected", [
+    ("var x = a / b / c;",                 "var x=a/b/c;"),
+    ("x = (a) / 2; y = arr[0] / 2",        "x=(a)/2;y=arr[0]/2"),
+    ("n = total / count // per item",      "n=total/count"),
+    ("var r = s.replace(/\\/+/g, '/');",   "var r=s.replace(/\\/+/g,'/');"),
+    ("if (/[/]/.test(s)) {}",              "if(/[/]/.test(s)){}"),
+    ("return /a b+c/.test(s)",             "return/a b+c/.test(s)"),
+    ("ok = typeof /x/",                    "ok=typeof/x/"),
+    ("parts = s.split( / +/ )",            "parts=s.split(/ +/)"),
+])
+def test_js_regex_vs_division(src, expected):
+    assert minify_js(src) == expected + "\n"
+
+
+# ── minify_js: strings and templates ─────────────────────────────────────────
+@pytest.mark.parametrize("src,expected", [
+    ("s = 'it\\'s // not a comment'",      "s='it\\'s // not a comment'"),
+    ('s = "a  /* kept */  b"',             's="a  /* kept */  b"'),
+    ("t = `x  ${ a  +  b }  y`",           "t=`x  ${a+b}  y`"),
+    ("t = `a ${ {k: `in ${x}`}.k } b`",    "t=`a ${{k:`in ${x}`}.k} b`"),
+    ("t = `${ f(`${ `${ deep }` }`) }  //` + 1", "t=`${f(`${`${deep}`}`)}  //`+1"),
+    ("t = `a\\`b ${c}`; u = {d: 1}",       "t=`a\\`b ${c}`;u={d:1}"),
+])
+def test_js_strings_and_templates_are_verbatim(src, expected):
+    assert minify_js(src) == expected + "\n"
+
+
+# ── minify_js: automatic semicolon insertion ─────────────────────────────────
+@pytest.mark.parametrize("src,expected", [
+    ("let a = 1\nlet b = 2\n(a)",          "let a=1\nlet b=2\n(a)"),
+    ("a = b\n++c",                         "a=b\n++c"),
+    ("return\nx",                          "return\nx"),
+    ("x = 1 // note\ny = 2",               "x=1\ny=2"),
+    ("x = 1 /* one\n two */ y = 2",        "x=1\ny=2"),
+    ("f(a,\n  b)\n.then(g)",               "f(a,b).then(g)"),
+    ("a = 1;  // x\n\n/* y */\n b()",      "a=1;b()"),
+    ("y = 2 /* c */ + 3",                  "y=2+3"),
+    ("a/**/b",                             "a b"),
+    ("if (x) {\n  y();\n}\n",              "if(x){y();}"),
+])
+def test_js_keeps_asi_sensitive_newlines(src, expected):
+    assert minify_js(src) == expected + "\n"
+
+
+@pytest.mark.parametrize("src,expected", [
+    ("a + +b",  "a+ +b"),
+    ("a - -b",  "a- -b"),
+    ("a + -b",  "a+-b"),
+    ("const  x = y", "const x=y"),
+])
+def test_js_keeps_spaces_that_separate_tokens(src, expected):
+    assert minify_js(src) == expected + "\n"
+
+
+# ── minify_css ────────────────────────────────────────────────────────────────
+@pytest.mark.parametrize("src,expected", [
+    ("a :hover { color : red ; }",               "a :hover{color :red}"),
+    ("a:hover { color: red; }",                  "a:hover{color:red}"),
+    ("div > p , a { margin: 0 auto; }",          "div>p,a{margin:0 auto}"),
+    ("/* gone */ b { }",                         "b{}"),
+    ("a::after { content: ' /* x */ ;} '; }",    "a::after{content:' /* x */ ;} '}"),
+    ("@media (max-width: 600px) {\n  a { x: y; }\n}", "@media (max-width:600px){a{x:y}}"),
+])
+def test_css(src, expected):
+    assert minify_css(src) == expected
+
+
+def test_css_descendant_pseudo_selector_keeps_its_space():
+    assert minify_css("a :hover{}") != minify_css("a:hover{}")
+
+
+# ── Real frontend assets ─────────────────────────────────────────────────────
+FRONTEND_JS = sorted(p.name for p in FRONTEND.glob("*.js"))
+
+
+@pytest.mark.parametrize("name", FRONTEND_JS)
+def test_frontend_js_is_stable(name):
+    src = (FRONTEND / name).read_text(encoding="utf-8")
+    once = minify_js(src)
+    assert minify_js(once) == once
+    assert len(once) < len(src)
+    # Only whitespace and comments may go; every other character survives in order.
+    without_comments = re.sub(r"/\*.*?\*/", "", src, flags=re.S)
+    without_comments = re.sub(r"(^|\s)//.*$", r"\1", without_comments, flags=re.M)
+    assert _squash(once) == _squash(without_comments)
+
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="node not installed")
+@pytest.mark.parametrize("name", FRONTEND_JS)
+def test_frontend_js_still_parses(name, tmp_path):
+    out = tmp_path / name
+    out.write_text(minify_js((FRONTEND / name).read_text(encoding="utf-8")), encoding="utf-8")
+    result = subprocess.run(["node", "--check", str(out)], capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+
+
+def test_frontend_css_is_stable():
+    src = (FRONTEND / "style.css").read_text(encoding="utf-8")
+    once = minify_css(src)
+    assert minify_css(once) == once
+    assert len(once) < len(src)
+    without_comments = re.sub(r"/\*.*?\*/", "", src, flags=re.S)
+    assert _squash(once) == _squash(without_comments).replace(";}", "}")
@@ -0,0 +1,158 @@
+"""Allocation and scheduling constraints of the study plan optimiser."""
+import math, random
+import pytest
+from services.study_planner import (
+    allocate_slots, _schedule, build_study_plan, REVIEW_GAPS, SLOT_HOURS,
+)
+
+CONFIGS = [
+    # (weights, days, daily_slots)
+    ([0.9, 0.5, 0.2], 7, 6),
+    ([0.8, 0.8, 0.8, 0.8, 0.8, 0.8], 7, 6),
+    ([0.95, 0.05], 5, 4),
+    ([0.7], 3, 6),
+    ([0.6, 0.5, 0.4, 0.3, 0.2, 0.1, 0.1, 0.05], 14, 8),
+    ([0.5, 0.4, 0.3], 2, 1),
+]
+
+
+def _random_configs(n=40, seed=7):
+    rng = random.Random(seed)
+    for _ in range(n):
+        k = rng.randint(1, 8)
+        yield [round(rng.uniform(0.05, 1.0), 2) for _ in range(k)], rng.randint(1, 21), rng.randint(1, 12)
+
+
+ALL_CONFIGS = CONFIGS + list(_random_configs())
+
+
+# ── allocate_slots ────────────────────────────────────────────────────────────
+@pytest.mark.parametrize("weights,days,daily_slots", ALL_CONFIGS)
+def test_allocation_totals_exact(weights, days, daily_slots):
+    total = days * daily_slots
+    assert sum(allocate_slots(weights, total)) == total
+
+
+@pytest.mark.parametrize("weights,days,daily_slots", ALL_CONFIGS)
+def test_every_topic_gets_a_slot_when_enough(weights, days, daily_slots):
+    total = days * daily_slots
+    slots = allocate_slots(weights, total)
+    if total >= len(weights):
+        assert min(slots) >= 1
+
+
+def test_allocation_proportional_to_weakness():
+    weights = [0.8, 0.4, 0.2, 0.1]
+    total = 150
+    slots = allocate_slots(weights, total)
+    # Heavier topics never get fewer slots …
+    assert slots == sorted(slots, reverse=True)
+    # … and each share is within one slot of its exact proportional quota
+    remaining = total - len(weights)
+    for w, s in zip(weights, slots):
+        assert abs(s - (1 + remaining * w / sum(weights))) < 1
+
+
+def test_allocation_edge_cases():
+    assert allocate_slots([], 10) == []
+    assert allocate_slots([0.5, 0.5], 0) == [0, 0]
+    # Fewer slots than topics: no guarantee, the heaviest topics win
+    assert allocate_slots([0.1, 0.9, 0.5], 2) == [0, 1, 1]
+
+
+# ── _schedule ─────────────────────────────────────────────────────────────────
+def _run(weights, days, daily_slots):
+    slots = allocate_slots(weights, days * daily_slots)
+    return slots, _schedule(slots, weights, days, daily_slots)
+
+
+@pytest.mark.parametrize("weights,days,daily_slots", ALL_CONFIGS)
+def test_schedule_within_daily_budget_and_places_everything(weights, days, daily_slots):
+    slots, schedule = _run(weights, days, daily_slots)
+    assert len(schedule) == days
+    for placed in schedule:
+        assert sum(n for _, n in placed) <= daily_slots
+    placed_per_topic = [0] * len(weights)
+    for placed in schedule:
+        for i, n in placed:
+            placed_per_topic[i] += n
+    assert placed_per_topic == slots
+
+
+@pytest.mark.parametrize("weights,days,daily_slots", ALL_CONFIGS)
+def test_half_day_cap_only_broken_when_nothing_else_left(weights, days, daily_slots):
+    slots, schedule = _run(weights, days, daily_slots)
+    cap = max(1, math.ceil(daily_slots / 2))
+    remaining = list(slots)
+    for placed in schedule:
+        today = dict(placed)
+        for i, n in placed:
+            remaining[i] -= n
+        for i, n in placed:
+            if n > cap:
+                # Every other topic either used its own half-day or has run out
+                for j in range(len(weights)):
+                    if j != i:
+                        assert today.get(j, 0) >= cap or remaining[j] == 0
+
+
+@pytest.mark.parametrize("weights,days,daily_slots", ALL_CONFIGS)
+def test_review_gaps_respected(weights, days, daily_slots):
+    """A topic comes back early only when the topics that were due could not fill the day."""
+    slots, schedule = _run(weights, days, daily_slots)
+    cap = max(1, math.ceil(daily_slots / 2))
+    n = len(weights)
+    remaining, next_day, sessions = list(slots), [0] * n, [0] * n
+    for day, placed in enumerate(schedule):
+        today = dict(placed)
+        due = [i for i in range(n) if remaining[i] and next_day[i] <= day]
+        early = [i for i in today if next_day[i] > day]
+        if early:
+            for i in due:
+                assert today.get(i, 0) >= min(cap, remaining[i])
+        for i, k in placed:
+            remaining[i] -= k
+            next_day[i] = day + REVIEW_GAPS[min(sessions[i], len(REVIEW_GAPS) - 1)]
+            sessions[i] += 1
+
+
+def test_review_gaps_strict_when_topics_are_plentiful():
+    # Eight topics, two slots a day: there is always a due topic to fill the day
+    weights = [0.5] * 8
+    _, schedule = _run(weights, 14, 2)
+    last_seen, sessions = {}, {}
+    for day, placed in enumerate(schedule):
+        for i, _ in placed:
+            if i in last_seen:
+                gap = REVIEW_GAPS[min(sessions[i] - 1, len(REVIEW_GAPS) - 1)]
+                assert day - last_seen[i] >= gap
+            last_seen[i] = day
+            sessions[i] = sessions.get(i, 0) + 1
+
+
+# ── build_study_plan ──────────────────────────────────────────────────────────
+def test_plan_hours_match_budget():
+    weak = [
+        {"subject": "Physics", "topic": "Optics", "weakness_score": 0.8},
+        {"subject": "Chemistry", "topic": "Bonding", "weakness_score": 0.4},
+    ]
+    plan = build_study_plan(weak, days=7, daily_hours=3)
+    assert len(plan["days"]) == 7
+    assert sum(d["duration_hours"] for d in plan["days"]) == pytest.approx(7 * 3)
+    for d in plan["days"]:
+        assert d["duration_hours"] <= 3
+        assert all(s["hours"] % SLOT_HOURS == 0 for s in d["sessions"])
+
+
+def test_plan_without_weak_topics_falls_back_to_general_revision():
+    plan = build_study_plan([], days=3, daily_hours=1)
+    assert {d["focus"] for d in plan["days"]} == {"General Revision"}
+
+
+@pytest.mark.parametrize("weights,days,daily_slots", ALL_CONFIGS)
+def test_every_plan_day_has_a_session(weights, days, daily_slots):
+    topics = [{"topic": f"T{i}", "subject": "S", "weakness_score": w} for i, w in enumerate(weights)]
+    plan = build_study_plan(topics, days=days, daily_hours=daily_slots * SLOT_HOURS)
+    assert len(plan["days"]) == days
+    for d in plan["days"]:
+        assert d["sessions"] and d["focus"] == d["sessions"][0]["topic"]
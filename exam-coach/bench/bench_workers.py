@@ -0,0 +1,167 @@
+"""
+Worker-scaling benchmark — throughput of `serve.py` as the uvicorn worker count grows.
+
+Seeds one SQLite DB with synthetic data, then for each worker count starts
+`backend/serve.py` as a real multi-process server and drives it over HTTP from
+several client processes with a mixed workload (analysis / progress / study plan /
+submit).  Reports throughput, p50/p95/p99 and speed-up relative to the first count.
+
+    python bench/bench_workers.py --workers 1,2,4 --clients 8 --duration 15 --out workers.json
+"""
+import os, sys, json, time, random, argparse, tempfile, subprocess, http.client, statistics
+from datetime import datetime
+from multiprocessing import Pool
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.join(BENCH_DIR, "..", "backend")
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, BACKEND_DIR)
+
+MIX = [("analysis", 0.4), ("progress", 0.3), ("study_plan", 0.2), ("submit", 0.1)]
+
+
+def percentile(sorted_values: list[float], p: float) -> float:
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * p
+    lo, hi = int(k), min(int(k) + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+def _client(args) -> tuple[list[float], int]:
+    """One load-generating process: keep-alive connection, weighted request mix."""
+    port, duration, student_ids, payloads, seed = args
+    rng = random.Random(seed)
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    names, weights = zip(*MIX)
+    latencies, errors = [], 0
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        kind = rng.choices(names, weights)[0]
+        sid = rng.choice(student_ids)
+        body, method = None, "GET"
+        if kind == "analysis":
+            path = f"/api/analysis/{sid}"
+        elif kind == "progress":
+            path = f"/api/progress/{sid}"
+        elif kind == "study_plan":
+            path, method = f"/api/study-plan/{sid}", "POST"
+        else:
+            path, method = "/api/tests/submit", "POST"
+            body = json.dumps({**rng.choice(payloads), "student_id": sid})
+        t = time.perf_counter()
+        try:
+            conn.request(method, path, body=body, headers={"Content-Type": "application/json"})
+            resp = conn.getresponse()
+            resp.read()
+            if resp.status >= 400:
+                errors += 1
+        except (OSError, http.client.HTTPException):
+            errors += 1
+            conn.close()
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+        latencies.append(time.perf_counter() - t)
+    conn.close()
+    return latencies, errors
+
+
+def _wait_healthy(port: int, timeout: float = 60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=2)
+            conn.request("GET", "/health")
+            if conn.getresponse().status == 200:
+                return
+        except OSError:
+            pass
+        time.sleep(0.25)
+    raise RuntimeError(f"server on port {port} did not become healthy")
+
+
+def run_level(workers: int, port: int, clients: int, duration: float, env: dict, ctx: dict) -> dict:
+    server = subprocess.Popen(
+        [sys.executable, os.path.join(BACKEND_DIR, "serve.py"), "--workers", str(workers),
+         "--port", str(port), "--host", "127.0.0.1"],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        _wait_healthy(port)
+        jobs = [(port, duration, ctx["student_ids"], ctx["payloads"], i) for i in range(clients)]
+        start = time.perf_counter()
+        with Pool(clients) as pool:
+            results = pool.map(_client, jobs)
+        wall = time.perf_counter() - start
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+    latencies = sorted(l * 1000 for lats, _ in results for l in lats)
+    return {
+        "workers": workers,
+        "requests": len(latencies),
+        "errors": sum(e for _, e in results),
+        "throughput_rps": round(len(latencies) / wall, 1),
+        "mean_ms": round(statistics.fmean(latencies), 2) if latencies else 0.0,
+        "p50_ms": round(percentile(latencies, 0.50), 2),
+        "p95_ms": round(percentile(latencies, 0.95), 2),
+        "p99_ms": round(percentile(latencies, 0.99), 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", default="1,2,4", help="comma-separated worker counts")
+    parser.add_argument("--clients", type=int, default=8, help="load-generating processes")
+    parser.add_argument("--duration", type=float, default=15, help="seconds per worker count")
+    parser.add_argument("--results", type=int, default=50_000, help="question results to seed")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--llm-url", help="point the servers at a (mock) LLM instead of the template fallback")
+    parser.add_argument("--out", default="bench_workers.json")
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix="exam-coach-workers-")
+    env = {
+        **os.environ,
+        "DATABASE_URL": f"sqlite:///{os.path.join(tmp, 'bench.db')}",
+        "SHARED_STORE_PATH": os.path.join(tmp, "shared_store.db"),
+        "RETENTION_ENABLED": "0",
+        "OPENAI_API_KEY": "mock" if args.llm_url else "",
+        "OPENAI_BASE_URL": args.llm_url or "",
+    }
+    os.environ.update({"DATABASE_URL": env["DATABASE_URL"]})
+
+    import synth
+    seed_info = synth.load_database(args.results)
+    first_id = seed_info["first_student_id"]
+    ctx = {
+        "student_ids": list(range(first_id, first_id + seed_info["students"])),
+        "payloads": list(synth.Generator(7).payloads(synth.QUESTIONS_PER_TEST * 20)),
+    }
+    print(f"[OK] database ready: {json.dumps(seed_info)}")
+
+    levels = []
+    for n in [int(w) for w in args.workers.split(",")]:
+        r = run_level(n, args.port, args.clients, args.duration, env, ctx)
+        r["speedup"] = round(r["throughput_rps"] / levels[0]["throughput_rps"], 2) if levels else 1.0
+        levels.append(r)
+        print(f"workers={n:<3} {r['throughput_rps']:>8} rps  p50 {r['p50_ms']:>8} ms  "
+              f"p95 {r['p95_ms']:>8} ms  p99 {r['p99_ms']:>8} ms  errors {r['errors']}  ×{r['speedup']}")
+
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump({
+            "meta": {
+                "timestamp": datetime.utcnow().isoformat(timespec="seconds"),
+                "cpu_count": os.cpu_count(),
+                "clients": args.clients,
+                "duration_s": args.duration,
+                "mix": dict(MIX),
+                "seed": seed_info,
+            },
+            "levels": levels,
+        }, f, indent=2)
+    print(f"[OK] results written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+"""
+Mock LLM server — an OpenAI-compatible stand-in for offline latency/robustness testing.
+
+Serves POST /v1/chat/completions (plain and `stream: true`) and answers the app's
+three prompt shapes (plan tips, recommendations, 7-day plans) with valid JSON built
+from the topics listed in the prompt.  Behaviour is tunable at start-up or at run
+time via POST /__config:
+
+    latency_ms        fixed delay before the first byte
+    tokens_per_sec    generation rate (non-streaming responses wait for the full body)
+    error_rate        fraction of requests answered with 500 / 429 / a hang past the client timeout
+    fence_rate        fraction of responses wrapped in markdown (see FENCE_STYLES)
+    fence_style       one FENCE_STYLES key, or "random"
+
+    python bench/mock_llm.py --port 8001 --latency-ms 400 --tokens-per-sec 80 --fence-rate 0.5
+    OPENAI_API_KEY=mock OPENAI_BASE_URL=http://localhost:8001/v1 uvicorn main:app
+"""
+import re, json, time, random, asyncio, argparse, threading
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+FENCE_STYLES = {
+    "json":        lambda body: f"```json\n{body}\n```",
+    "bare":        lambda body: f"```\n{body}\n```",
+    "upper":       lambda body: f"```JSON\n{body}\n```",
+    "prose":       lambda body: f"Here is your personalised plan:\n```json\n{body}\n```",
+    "trailing":    lambda body: f"```json\n{body}\n```\nGood luck with your preparation!",
+    "truncated":   lambda body: f"```json\n{body[: len(body) // 2]}",
+}
+ERROR_KINDS = ("server_error", "rate_limit", "hang")
+
+_TOPIC_LINE = re.compile(r"^- (.+?) \(([^)]+)\)", re.MULTILINE)
+
+config = {
+    "latency_ms": 0.0,
+    "tokens_per_sec": 0.0,      # 0 = instant
+    "error_rate": 0.0,
+    "error_kinds": list(ERROR_KINDS),
+    "hang_seconds": 120.0,
+    "fence_rate": 0.0,
+    "fence_style": "random",
+    "seed": None,
+}
+stats = {"requests": 0, "errors": 0, "fenced": 0, "streamed": 0}
+_rng = random.Random()
+_lock = threading.Lock()
+
+app = FastAPI(title="Exam Coach Mock LLM")
+
+
+# ── Response bodies ───────────────────────────────────────────────────────────
+def _topics(prompt: str) -> list[tuple[str, str]]:
+    return _TOPIC_LINE.findall(prompt) or [("General Revision", "All")]
+
+
+def _tips(topics) -> dict:
+    return {"tips": [
+        {"subject": subject, "topic": topic,
+         "tip": f"Spend the first 20 minutes on {topic} formulas, then drill timed questions."}
+        for topic, subject in topics
+    ]}
+
+
+def _recommendations(topics) -> dict:
+    return {"recommendations": [
+        {
+            "topic": topic, "subject": subject,
+            "why_weak": f"Frequent conceptual slips in {topic}.",
+            "concept_revision": [f"Revise core definitions of {topic}"],
+            "practice_exercises": [f"25 mixed-difficulty {topic} problems"],
+            "mock_tests": [f"15-minute sectional test on {topic}"],
+            "resources": [{"type": "article", "title": f"{topic} notes", "url": "https://example.com"}],
+            "improvement_tip": f"Track every {topic} mistake in an error log.",
+        }
+        for topic, subject in topics
+    ]}
+
+
+def _plan(topics) -> dict:
+    return {"days": [
+        {
+            "day": i + 1, "date_label": f"Day {i+1}", "focus": topics[i % len(topics)][0],
+            "duration_hours": 2, "practice_questions": 20,
+            "revision_blocks": ["Concept review", "Practice set"], "tip": "Stay consistent.",
+        }
+        for i in range(7)
+    ]}
+
+
+def build_content(system_prompt: str, user_prompt: str) -> str:
+    topics = _topics(user_prompt)
+    if '"tips"' in system_prompt:
+        body = _tips(topics)
+    elif '"recommendations"' in system_prompt:
+        body = _recommendations(topics)
+    else:
+        body = _plan(topics)
+    text = json.dumps(body)
+
+    if config["fence_rate"] and _rng.random() < config["fence_rate"]:
+        style = config["fence_style"]
+        if style == "random":
+            style = _rng.choice(list(FENCE_STYLES))
+        text = FENCE_STYLES[style](text)
+        with _lock:
+            stats["fenced"] += 1
+    return text
+
+
+def _tokens(text: str) -> list[str]:
+    """Rough ~4-chars-per-token split that keeps the text reassemblable."""
+    return [text[i:i + 4] for i in range(0, len(text), 4)] or [""]
+
+
+# ── Endpoints ─────────────────────────────────────────────────────────────────
+def _error_response(kind: str):
+    if kind == "rate_limit":
+        return JSONResponse(status_code=429, headers={"retry-after": "0"}, content={
+            "error": {"message": "Rate limit reached (mock)", "type": "rate_limit_error", "code": "rate_limit_exceeded"}})
+    return JSONResponse(status_code=500, content={
+        "error": {"message": "Internal server error (mock)", "type": "server_error", "code": None}})
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    req = await request.json()
+    with _lock:
+        stats["requests"] += 1
+    messages = req.get("messages", [])
+    system_prompt = next((m["content"] for m in messages if m.get("role") == "system"), "")
+    user_prompt = next((m["content"] for m in messages if m.get("role") == "user"), "")
+    model = req.get("model", "mock")
+
+    if config["error_rate"] and _rng.random() < config["error_rate"]:
+        kind = _rng.choice(config["error_kinds"])
+        with _lock:
+            stats["errors"] += 1
+        if kind == "hang":
+            await asyncio.sleep(config["hang_seconds"])
+        return _error_response(kind)
+
+    if config["latency_ms"]:
+        await asyncio.sleep(config["latency_ms"] / 1000)
+
+    content = build_content(system_prompt, user_prompt)
+    tokens = _tokens(content)
+    per_token = 1 / config["tokens_per_sec"] if config["tokens_per_sec"] else 0
+    created = int(time.time())
+    usage = {
+        "prompt_tokens": (len(system_prompt) + len(user_prompt)) // 4,
+        "completion_tokens": len(tokens),
+        "total_tokens": (len(system_prompt) + len(user_prompt)) // 4 + len(tokens),
+    }
+
+    if req.get("stream"):
+        with _lock:
+            stats["streamed"] += 1
+
+        async def events():
+            for i, tok in enumerate(tokens):
+                delta = {"role": "assistant", "content": tok} if i == 0 else {"content": tok}
+                chunk = {"id": "chatcmpl-mock", "object": "chat.completion.chunk", "created": created,
+                         "model": model, "choices": [{"index": 0, "delta": delta, "finish_reason": None}]}
+                yield f"data: {json.dumps(chunk)}\n\n"
+                if per_token:
+                    await asyncio.sleep(per_token)
+            done = {"id": "chatcmpl-mock", "object": "chat.completion.chunk", "created": created,
+                    "model": model, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]}
+            yield f"data: {json.dumps(done)}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    if per_token:
+        await asyncio.sleep(per_token * len(tokens))
+    return {
+        "id": "chatcmpl-mock",
+        "object": "chat.completion",
+        "created": created,
+        "model": model,
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+        "usage": usage,
+    }
+
+
+@app.get("/v1/models")
+def list_models():
+    return {"object": "list", "data": [{"id": "mock", "object": "model", "owned_by": "exam-coach"}]}
+
+
+@app.get("/__config")
+def get_config():
+    return {"config": config, "stats": stats}
+
+
+@app.post("/__config")
+async def update_config(request: Request):
+    changes = await request.json()
+    unknown = set(changes) - set(config)
+    if unknown:
+        return JSONResponse(status_code=400, content={"detail": f"Unknown keys: {sorted(unknown)}"})
+    config.update(changes)
+    if "seed" in changes:
+        _rng.seed(changes["seed"])
+    return {"config": config}
+
+
+@app.post("/__reset")
+def reset_stats():
+    for k in stats:
+        stats[k] = 0
+    return stats
+
+
+def main():
+    import uvicorn
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--tokens-per-sec", type=float, default=0)
+    parser.add_argument("--error-rate", type=float, default=0)
+    parser.add_argument("--errors", default=",".join(ERROR_KINDS), help=f"subset of {','.join(ERROR_KINDS)}")
+    parser.add_argument("--hang-seconds", type=float, default=120)
+    parser.add_argument("--fence-rate", type=float, default=0)
+    parser.add_argument("--fence-style", default="random", choices=["random", *FENCE_STYLES])
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+    unknown = set(args.errors.split(",")) - set(ERROR_KINDS)
+    if unknown:
+        parser.error(f"unknown error kinds: {sorted(unknown)}")
+
+    config.update({
+        "latency_ms": args.latency_ms,
+        "tokens_per_sec": args.tokens_per_sec,
+        "error_rate": args.error_rate,
+        "error_kinds": args.errors.split(","),
+        "hang_seconds": args.hang_seconds,
+        "fence_rate": args.fence_rate,
+        "fence_style": args.fence_style,
+        "seed": args.seed,
+    })
+    _rng.seed(args.seed)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
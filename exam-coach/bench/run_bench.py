@@ -0,0 +1,203 @@
+"""
+Benchmark harness — drives the real FastAPI app in-process and reports latency.
+
+Seeds a throw-away SQLite DB with synthetic data (see synth.py), stubs the LLM with a
+canned response (optionally with artificial latency) or points the real OpenAI client
+at a mock server (see mock_llm.py), then runs each scenario through Starlette's
+TestClient and records throughput and p50/p95/p99 latency.
+
+    python bench/run_bench.py --results 100000 --requests 200 --out bench.json
+    python bench/run_bench.py --llm-url http://localhost:8001/v1 --scenarios study_plan,recommendations
+    python bench/run_bench.py --baseline bench.json --tolerance 0.2    # fail on regressions
+"""
+import os, sys, json, time, random, argparse, tempfile, platform, statistics
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, os.path.join(BENCH_DIR, "..", "backend"))
+
+BURST_STUDENTS = 5
+SCENARIOS = ["submit", "submit_burst", "analysis", "progress", "study_plan", "recommendations", "auth_login", "auth_register"]
+
+
+def percentile(sorted_values: list[float], p: float) -> float:
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * p
+    lo, hi = int(k), min(int(k) + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+def _stub_llm(latency_ms: float):
+    """Replace the network call with canned JSON so the LLM parsing path still runs."""
+    from services import llm_client
+
+    def fake_chat(system_prompt: str, user_prompt: str):
+        if latency_ms:
+            time.sleep(latency_ms / 1000)
+        if '"tips"' in system_prompt:
+            topics = [line[2:].rsplit(" (", 1) for line in user_prompt.splitlines() if line.startswith("- ")]
+            return json.dumps({"tips": [
+                {"subject": subj.rstrip(")"), "topic": topic, "tip": f"Drill {topic} daily."}
+                for topic, subj in topics
+            ]})
+        return json.dumps({"recommendations": []})
+
+    llm_client._chat = fake_chat
+
+
+def run_scenario(client, name: str, n: int, concurrency: int, ctx: dict) -> dict:
+    rng = random.Random(name)
+    student_ids = ctx["student_ids"]
+
+    def one(i: int):
+        sid = rng.choice(student_ids)
+        if name == "submit":
+            return client.post("/api/tests/submit", json={**ctx["payloads"][i % len(ctx["payloads"])], "student_id": sid})
+        if name == "submit_burst":
+            # A class flush: many submits for a handful of students back to back
+            burst_sid = student_ids[i % min(BURST_STUDENTS, len(student_ids))]
+            return client.post("/api/tests/submit", json={**ctx["payloads"][i % len(ctx["payloads"])], "student_id": burst_sid})
+        if name == "analysis":
+            return client.get(f"/api/analysis/{sid}")
+        if name == "progress":
+            return client.get(f"/api/progress/{sid}")
+        if name == "study_plan":
+            return client.post(f"/api/study-plan/{sid}")
+        if name == "recommendations":
+            return client.post(f"/api/recommendations/{sid}")
+        if name == "auth_login":
+            return client.post("/api/auth/login", json={"email": f"synthetic{sid}@example.com", "password": "password"})
+        if name == "auth_register":
+            return client.post("/api/auth/register", json={
+                "name": "Bench", "email": f"bench-{ctx['run_id']}-{i}@example.com", "password": "password"})
+        raise ValueError(name)
+
+    def timed(i: int):
+        t = time.perf_counter()
+        resp = one(i)
+        return time.perf_counter() - t, resp.status_code
+
+    start = time.perf_counter()
+    if concurrency > 1:
+        with ThreadPoolExecutor(concurrency) as pool:
+            samples = list(pool.map(timed, range(n)))
+    else:
+        samples = [timed(i) for i in range(n)]
+    if name.startswith("submit"):
+        # Coalesced rescores are part of the cost of submitting: finish them inside the
+        # timed window rather than letting them run during the next scenario
+        from services import rescore_queue
+        rescore_queue.drain()
+    wall = time.perf_counter() - start
+
+    latencies = sorted(s[0] * 1000 for s in samples)
+    errors = sum(1 for s in samples if s[1] >= 400)
+    return {
+        "requests": n,
+        "errors": errors,
+        "throughput_rps": round(n / wall, 1) if wall else 0.0,
+        "mean_ms": round(statistics.fmean(latencies), 2),
+        "p50_ms": round(percentile(latencies, 0.50), 2),
+        "p95_ms": round(percentile(latencies, 0.95), 2),
+        "p99_ms": round(percentile(latencies, 0.99), 2),
+        "max_ms": round(latencies[-1], 2),
+    }
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Scenarios whose p95 grew or throughput shrank by more than `tolerance`."""
+    regressions = []
+    for name, cur in current["scenarios"].items():
+        base = baseline.get("scenarios", {}).get(name)
+        if not base:
+            continue
+        if base["p95_ms"] and cur["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {base['p95_ms']} → {cur['p95_ms']} ms")
+        if base["throughput_rps"] and cur["throughput_rps"] < base["throughput_rps"] * (1 - tolerance):
+            regressions.append(f"{name}: throughput {base['throughput_rps']} → {cur['throughput_rps']} rps")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--results", type=int, default=10_000, help="question results to seed (1k … 1M)")
+    parser.add_argument("--requests", type=int, default=100, help="requests per scenario")
+    parser.add_argument("--auth-requests", type=int, default=10, help="requests for the bcrypt-bound auth scenarios")
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--llm-latency-ms", type=float, default=0, help="artificial delay of the stubbed LLM")
+    parser.add_argument("--llm-url", help="use the real OpenAI client against this base URL (e.g. mock_llm.py)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--db", help="reuse this SQLite file instead of a fresh temp DB (skips seeding if it exists)")
+    parser.add_argument("--out", default="bench_results.json")
+    parser.add_argument("--baseline", help="previous results JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    db_path = args.db or os.path.join(tempfile.mkdtemp(prefix="exam-coach-bench-"), "bench.db")
+    needs_seed = not os.path.exists(db_path)
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.abspath(db_path)}"
+    os.environ["SHARED_STORE_PATH"] = os.path.splitext(os.path.abspath(db_path))[0] + ".store.db"
+    if args.llm_url:
+        os.environ["OPENAI_API_KEY"] = "mock"
+        os.environ["OPENAI_BASE_URL"] = args.llm_url
+
+    import synth
+    from fastapi.testclient import TestClient
+    from database import SessionLocal, Student
+
+    seed_info = synth.load_database(args.results, args.seed) if needs_seed else {"reused": db_path}
+    print(f"[OK] database ready: {json.dumps(seed_info)}")
+
+    if not args.llm_url:
+        _stub_llm(args.llm_latency_ms)
+    from main import app
+
+    db = SessionLocal()
+    try:
+        student_ids = [sid for (sid,) in db.query(Student.id).filter(Student.email.like("synthetic%")).all()]
+    finally:
+        db.close()
+    ctx = {
+        "student_ids": student_ids or [1],
+        "payloads": list(synth.Generator(args.seed + 1).payloads(synth.QUESTIONS_PER_TEST * 20)),
+        "run_id": int(time.time()),
+    }
+
+    results = {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "question_results": args.results,
+            "concurrency": args.concurrency,
+            "llm": args.llm_url or f"stub ({args.llm_latency_ms} ms)",
+            "seed": seed_info,
+        },
+        "scenarios": {},
+    }
+    with TestClient(app) as client:
+        for name in args.scenarios.split(","):
+            n = args.auth_requests if name.startswith("auth") else args.requests
+            r = run_scenario(client, name, n, args.concurrency, ctx)
+            results["scenarios"][name] = r
+            print(f"{name:<16} {r['throughput_rps']:>8} rps  p50 {r['p50_ms']:>8} ms  "
+                  f"p95 {r['p95_ms']:>8} ms  p99 {r['p99_ms']:>8} ms  errors {r['errors']}")
+
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"[OK] results written to {args.out}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for line in regressions:
+            print(f"[REGRESSION] {line}")
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
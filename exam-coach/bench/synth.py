@@ -0,0 +1,198 @@
+"""
+Synthetic data generator — realistic students, mock tests and topic distributions.
+
+Each student gets a latent per-topic ability (Beta-distributed, so most topics are
+"okay" and a few are clearly weak) and a base pace; each test draws ~30 questions
+from a Zipf-weighted topic mix, so popular chapters dominate like they do in real
+papers.  Correctness and time taken both follow the student's ability on the topic.
+
+    python bench/synth.py --results 100000 --db /tmp/bench.db      # bulk-load a DB
+    python bench/synth.py --results 1000 --out payloads.jsonl       # MockTestIn payloads
+"""
+import os, sys, json, random, argparse, time
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+CATALOG = {
+    "Physics": ["Laws of Motion", "Electrostatics", "Optics", "Thermodynamics",
+                "Rotational Motion", "Current Electricity", "Modern Physics", "Waves"],
+    "Chemistry": ["Chemical Bonding", "Organic Chemistry", "Thermodynamics", "Equilibrium",
+                  "Electrochemistry", "Coordination Compounds", "Periodic Table", "Solutions"],
+    "Mathematics": ["Algebra", "Calculus", "Coordinate Geometry", "Probability",
+                    "Vectors", "Trigonometry", "Matrices", "Sequences & Series"],
+}
+TOPICS = [(subject, topic) for subject, topics in CATALOG.items() for topic in topics]
+OPTIONS = "ABCD"
+
+QUESTIONS_PER_TEST = 30
+TESTS_PER_STUDENT = 5
+
+_Result = namedtuple("_Result", "subject topic is_correct time_taken")
+
+
+class Generator:
+    """Deterministic for a given seed, so benchmark runs are comparable."""
+
+    def __init__(self, seed: int = 42, questions_per_test: int = QUESTIONS_PER_TEST):
+        self.rng = random.Random(seed)
+        self.questions_per_test = questions_per_test
+        # Zipf-like topic popularity, shuffled so it is not tied to catalog order
+        weights = [1 / (rank + 1) ** 0.8 for rank in range(len(TOPICS))]
+        self.rng.shuffle(weights)
+        self.topic_weights = weights
+
+    def student_profile(self) -> dict:
+        rng = self.rng
+        return {
+            "ability": {t: rng.betavariate(4, 2.5) for t in TOPICS},
+            "pace": rng.uniform(0.7, 1.4),          # multiplier on time per question
+        }
+
+    def test_questions(self, profile: dict, test_no: int) -> list[dict]:
+        """One test's worth of MockTestIn-shaped questions; later tests improve slightly."""
+        rng = self.rng
+        drawn = rng.choices(TOPICS, weights=self.topic_weights, k=self.questions_per_test)
+        questions = []
+        for i, (subject, topic) in enumerate(drawn):
+            ability = min(0.97, profile["ability"][(subject, topic)] + 0.03 * test_no)
+            correct = rng.choice(OPTIONS)
+            if rng.random() < ability:
+                answer = correct
+            else:
+                answer = rng.choice([o for o in OPTIONS if o != correct])
+            base = 40 + (1 - ability) * 120
+            questions.append({
+                "subject": subject,
+                "topic": topic,
+                "question_id": f"{subject[:3].upper()}{i+1:03d}",
+                "student_answer": answer,
+                "correct_answer": correct,
+                "time_taken": round(max(5.0, rng.gauss(base * profile["pace"], base * 0.25)), 1),
+            })
+        return questions
+
+    def payloads(self, n_results: int, student_ids: list[int] = None):
+        """Yield MockTestIn dicts until `n_results` question results have been produced."""
+        per_student = self.questions_per_test * TESTS_PER_STUDENT
+        n_students = max(1, -(-n_results // per_student))
+        student_ids = student_ids or list(range(1, n_students + 1))
+        produced = 0
+        for sid in student_ids:
+            profile = self.student_profile()
+            for test_no in range(TESTS_PER_STUDENT):
+                if produced >= n_results:
+                    return
+                qs = self.test_questions(profile, test_no)[: n_results - produced]
+                produced += len(qs)
+                yield {"student_id": sid, "questions": qs}
+
+
+def load_database(n_results: int, seed: int = 42, batch_size: int = 10_000, score: bool = True) -> dict:
+    """
+    Bulk-insert synthetic students/tests/results (and, with `score`, their topic
+    scores) through SQLAlchemy Core into the database configured by DATABASE_URL.
+    Scores are computed in memory with the app's own scorer, so loading stays
+    linear in the number of results.  New rows get explicit ids after the current
+    maxima, so loading is repeatable on top of an existing DB.
+    """
+    from sqlalchemy import insert, func, select
+    from database import init_db, engine, Student, MockTest, QuestionResult, TopicScore
+    from services.weakness_scorer import score_topics
+    from routers.auth import get_password_hash
+
+    init_db()
+    gen = Generator(seed)
+    per_student = gen.questions_per_test * TESTS_PER_STUDENT
+    n_students = max(1, -(-n_results // per_student))
+    with engine.connect() as conn:
+        max_student = conn.execute(select(func.max(Student.id))).scalar() or 0
+        max_test = conn.execute(select(func.max(MockTest.id))).scalar() or 0
+    student_ids = list(range(max_student + 1, max_student + n_students + 1))
+    shared_hash = get_password_hash("password")   # one bcrypt hash for every synthetic student
+    start_time = datetime.utcnow() - timedelta(days=TESTS_PER_STUDENT * 7)
+
+    t0 = time.perf_counter()
+    with engine.begin() as conn:
+        conn.execute(insert(Student.__table__), [
+            {"id": sid, "name": f"Synthetic {sid}", "email": f"synthetic{sid}@example.com",
+             "password_hash": shared_hash, "created_at": start_time}
+            for sid in student_ids
+        ])
+
+    test_id = max_test
+    tests_taken: dict[int, int] = {}
+    tests, results, scores, written = [], [], [], 0
+    student_rows: list[_Result] = []
+    current_sid = None
+
+    def score_student():
+        if score and student_rows:
+            scores.extend({"student_id": current_sid, "updated_at": datetime.utcnow(), **s}
+                          for s in score_topics(student_rows))
+        student_rows.clear()
+
+    def flush(conn):
+        nonlocal tests, results, scores, written
+        if tests:
+            conn.execute(insert(MockTest.__table__), tests)
+            conn.execute(insert(QuestionResult.__table__), results)
+        if scores:
+            conn.execute(insert(TopicScore.__table__), scores)
+        written += len(results)
+        tests, results, scores = [], [], []
+
+    with engine.begin() as conn:
+        for payload in gen.payloads(n_results, student_ids):
+            sid = payload["student_id"]
+            if sid != current_sid:
+                score_student()
+                current_sid = sid
+            test_id += 1
+            n = tests_taken[sid] = tests_taken.get(sid, -1) + 1
+            tests.append({
+                "id": test_id,
+                "student_id": sid,
+                "submitted_at": start_time + timedelta(days=7 * n),
+                "raw_json": json.dumps(payload),
+            })
+            for q in payload["questions"]:
+                is_correct = q["student_answer"] == q["correct_answer"]
+                results.append({**q, "mock_test_id": test_id, "is_correct": is_correct})
+                student_rows.append(_Result(q["subject"], q["topic"], is_correct, q["time_taken"]))
+            if len(results) >= batch_size:
+                flush(conn)
+        score_student()
+        flush(conn)
+
+    return {
+        "students": n_students,
+        "first_student_id": student_ids[0],
+        "tests": test_id - max_test,
+        "question_results": written,
+        "seconds": round(time.perf_counter() - t0, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--results", type=int, default=1000, help="number of question results (1k … 1M)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--db", help="SQLite file to bulk-load (sets DATABASE_URL)")
+    parser.add_argument("--out", help="write MockTestIn payloads as JSON lines instead")
+    args = parser.parse_args()
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            for payload in Generator(args.seed).payloads(args.results):
+                f.write(json.dumps(payload) + "\n")
+        print(f"[OK] wrote {args.results} question results to {args.out}")
+        return
+
+    if args.db:
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.abspath(args.db)}"
+    print(json.dumps(load_database(args.results, args.seed), indent=2))
+
+if __name__ == "__main__":
+    main()
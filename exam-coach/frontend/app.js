@@ -124,7 +124,7 @@ document.getElementById("submit-btn").addEventListener("click", async () => {
       Correct: <strong>${res.correct}</strong> &nbsp;|&nbsp;
       Accuracy: <strong>${res.accuracy}%</strong><br>
       Mock Test ID: <code>${res.mock_test_id}</code> — 
-      Weakness scores updated automatically.`;
+      ${res.scores_pending ? "Weakness scores will refresh in a moment." : "Weakness scores updated automatically."}`;
     showToast("Test analysed! Navigate to 'Weak Topics' tab.", "success");
   } catch (e) {
     const box = document.getElementById("submit-result");
@@ -1,4 +1,8 @@
 # ─── start.ps1 ─── Personalized Entrance Exam Coach Launcher ───────────────
+# Usage: start.ps1             (dev server with auto-reload)
+#        start.ps1 -Workers 4  (production mode: 4 uvicorn workers, no reload)
+param([int]$Workers = 0)
+
 Write-Host "🎯 Starting Personalized Entrance Exam Coach..." -ForegroundColor Cyan
 
 $BackendDir = Join-Path $PSScriptRoot "backend"
@@ -31,4 +35,9 @@ Write-Host "   App:     http://localhost:8000" -ForegroundColor White
 Write-Host "   API docs: http://localhost:8000/docs" -ForegroundColor White
 Write-Host ""
 Set-Location $BackendDir
-& $UvicornExe main:app --reload --port 8000
+if ($Workers -gt 0) {
+    $PythonExe = Join-Path $VenvDir "Scripts\python.exe"
+    & $PythonExe serve.py --workers $Workers --port 8000
+} else {
+    & $UvicornExe main:app --reload --port 8000
+}